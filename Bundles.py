@@ -0,0 +1,204 @@
+# -------------------------------------------------------------------------------
+# Name:        Bundles
+# Purpose:     Pack the small files of a folder into compressed archives (ZIP) by time window, so thousands of tiny
+#              files are uploaded to SharePoint as a few transfers, and keep an index (JSON) of every remote folder
+#              with the archive where each file is, so the files can be located and extracted one by one. The archives
+#              are named by their content, so an archive already uploaded is never overwritten with other files.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import os
+import json
+import shutil
+import hashlib
+import zipfile
+import datetime
+from pathlib import Path
+
+BUNDLE_WINDOW = 24 * 60 * 60  # seconds of the time window of every archive, a day
+BUNDLE_MAX_FILE_SIZE = 1024 * 1024  # bytes, bigger files are not bundled
+BUNDLE_PREFIX = 'bundle_'
+BUNDLE_INDEX = 'bundle_index.json'  # name of the index in every folder with archives
+BUNDLE_DIGEST_SIZE = 12  # hexadecimal characters of the content hash in the name of the archives
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def window_start(mtime, window=BUNDLE_WINDOW):
+    """
+    Get the start of the time window of a modification time, in local time, so the windows of a day start at midnight.
+
+    Args:
+        mtime (float): Modification time (seconds since the epoch).
+        window (int, optional): Seconds of the window. Defaults to BUNDLE_WINDOW.
+
+    Returns:
+        datetime.datetime: The start of the window (local time).
+    """
+    seconds = (datetime.datetime.fromtimestamp(mtime) - _EPOCH).total_seconds()
+    return _EPOCH + datetime.timedelta(seconds=seconds // window * window)
+
+
+def bundle_name(start, digest):
+    """
+    Get the name of an archive of the time window that starts at start, with the hash of its content.
+    """
+    return f'{BUNDLE_PREFIX}{start:%Y%m%d_%H%M%S}_{digest[:BUNDLE_DIGEST_SIZE]}.zip'
+
+
+def group_files(files, root, window=BUNDLE_WINDOW, max_file_size=BUNDLE_MAX_FILE_SIZE):
+    """
+    Group the small files by their folder (relative to root) and the time window of their modification time.
+
+    Args:
+        files (iterable of str or Path): Local files.
+        root (str or Path): Folder the relative folders are taken from.
+        window (int, optional): Seconds of the time windows. Defaults to BUNDLE_WINDOW.
+        max_file_size (int, optional): Files bigger than this are not bundled. Defaults to BUNDLE_MAX_FILE_SIZE.
+
+    Returns:
+        tuple: (dict {(relative folder, start of the window): list of Path}, list of Path of the files not bundled).
+    """
+    groups, large = {}, []
+    for f in files:
+        f = Path(f)
+        st = f.stat()
+        if st.st_size > max_file_size or f.name.startswith(BUNDLE_PREFIX) or f.name == BUNDLE_INDEX:
+            large.append(f)
+            continue
+        key = (f.parent.relative_to(root).as_posix(), window_start(st.st_mtime, window))
+        groups.setdefault(key, []).append(f)
+    return groups, large
+
+
+def build_bundle(files, folder, start):
+    """
+    Write the files into a compressed archive named by its time window and its content (see bundle_name). The members
+    are sorted and keep the modification time of their file, so the same files always give the same archive, and other
+    files give an archive with another name.
+
+    Args:
+        files (iterable of str or Path): Local files, all in the same folder.
+        folder (str or Path): Folder where the archive is written.
+        start (datetime.datetime): Start of the time window of the files.
+
+    Returns:
+        tuple: (Path of the archive, list of dict with an entry (name, size, mtime) for every member).
+    """
+    entries = []
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    building = folder.joinpath(f'.{bundle_name(start, "building")}')
+    with zipfile.ZipFile(building, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for f in sorted(Path(f) for f in files):
+            st = f.stat()
+            zf.write(f, f.name)
+            entries.append({'name': f.name, 'size': st.st_size, 'mtime': st.st_mtime})
+    digest = hashlib.sha256()
+    with building.open('rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    archive_path = folder.joinpath(bundle_name(start, digest.hexdigest()))
+    os.replace(building, archive_path)
+    return archive_path, entries
+
+
+def new_index():
+    """
+    Get an empty index: files maps the name of every bundled file to its archive, size and modification time, and
+    bundles maps every archive to the start of its window and its number of files.
+    """
+    return {'files': {}, 'bundles': {}}
+
+
+def read_index(content):
+    """
+    Read an index from the content of its JSON file.
+
+    Args:
+        content (bytes or str or None): Content of the index.
+
+    Returns:
+        dict: The index, empty if there is no content or it is not valid.
+    """
+    if not content:
+        return new_index()
+    try:
+        index = json.loads(content)
+    except ValueError:
+        return new_index()
+    index.setdefault('files', {})
+    index.setdefault('bundles', {})
+    return index
+
+
+def add_to_index(index, archive, entries, start):
+    """
+    Record the files of an archive in an index, replacing the files with the same name. Call prune_index after adding
+    the archives, to count their files again and remove the archives left without files.
+
+    Args:
+        index (dict): The index.
+        archive (str): Name of the archive.
+        entries (list of dict): The entries returned by build_bundle.
+        start (datetime.datetime): Start of the time window of the archive.
+    """
+    for entry in entries:
+        index['files'][entry['name']] = {'bundle': archive, 'size': entry['size'], 'mtime': entry['mtime']}
+    index['bundles'][archive] = {'window_start': start.isoformat(), 'files': len(entries)}
+
+
+def prune_index(index):
+    """
+    Count again the files of every archive of an index, removing the archives none of whose files are in the index any
+    more (all of them are in newer archives), and the files whose archive is not in the index.
+
+    Args:
+        index (dict): The index.
+
+    Returns:
+        list of str: The names of the archives removed from the index.
+    """
+    counts = {}
+    for name, entry in list(index['files'].items()):
+        if entry['bundle'] not in index['bundles']:
+            del index['files'][name]
+        else:
+            counts[entry['bundle']] = counts.get(entry['bundle'], 0) + 1
+    removed = [archive for archive in index['bundles'] if archive not in counts]
+    for archive in removed:
+        del index['bundles'][archive]
+    for archive, count in counts.items():
+        index['bundles'][archive]['files'] = count
+    return removed
+
+
+def dump_index(index):
+    """
+    Get the content of the JSON file of an index.
+    """
+    return json.dumps(index, indent=1, sort_keys=True).encode()
+
+
+def extract(archive, name, destination):
+    """
+    Extract one file from an archive.
+
+    Args:
+        archive (str or Path or file object): The archive.
+        name (str): Name of the file in the archive.
+        destination (str or Path or file object): Local path, or an open binary file object, where it is written.
+    """
+    with zipfile.ZipFile(archive) as zf, zf.open(name) as member:
+        if isinstance(destination, (str, Path)):
+            Path(destination).parent.mkdir(parents=True, exist_ok=True)
+            with open(destination, 'wb') as f:
+                shutil.copyfileobj(member, f)
+        else:
+            shutil.copyfileobj(member, destination)
@@ -0,0 +1,102 @@
+# -------------------------------------------------------------------------------
+# Name:        ChangeTokens
+# Purpose:     Keep the change tokens of SharePoint in a local file between runs, so every run only asks for the
+#              changes of the document library made after the last one.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import os
+import json
+import datetime
+import threading
+from pathlib import Path
+
+CHANGE_TOKENS_NAME = 'change_tokens.json'
+
+
+class ChangeTokens:
+    """
+    A thread safe store of change tokens in a JSON file, every token with the time it was saved.
+
+    Attributes:
+        path (Path): Path of the JSON file with the tokens.
+    """
+
+    def __init__(self, path=None):
+        """
+        The constructor for the ChangeTokens class.
+
+        Args:
+            path (str or Path, optional): Path of the JSON file. Defaults to CHANGE_TOKENS_NAME in the current working
+                directory.
+        """
+        if path is None:
+            path = Path(os.getcwd(), CHANGE_TOKENS_NAME)
+        self.path = Path(path)
+        self._lock_ = threading.Lock()
+
+    def _read_(self):
+        """
+        Read all the tokens in the file. Must be called with the lock acquired.
+        """
+        try:
+            with self.path.open('r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_(self, tokens):
+        """
+        Replace the file with the given tokens. Must be called with the lock acquired.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f'{self.path.name}.tmp')
+        with tmp_path.open('w') as f:
+            json.dump(tokens, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        """
+        Get the token saved for a key.
+
+        Args:
+            key (str): Key of the token, for example the site, document library and folder.
+
+        Returns:
+            str or None: The token, or None if there is no token for the key.
+        """
+        with self._lock_:
+            entry = self._read_().get(key)
+        return entry.get('token') if entry else None
+
+    def put(self, key, token):
+        """
+        Save the token of a key.
+
+        Args:
+            key (str): Key of the token.
+            token (str): The change token.
+        """
+        with self._lock_:
+            tokens = self._read_()
+            tokens[key] = {'token': token, 'saved': datetime.datetime.now().isoformat(timespec='seconds')}
+            self._write_(tokens)
+
+    def remove(self, key):
+        """
+        Remove the token of a key, so the next run starts again from the current changes.
+
+        Args:
+            key (str): Key of the token.
+        """
+        with self._lock_:
+            tokens = self._read_()
+            if tokens.pop(key, None) is None:
+                return
+            self._write_(tokens)
@@ -1,16 +1,25 @@
 # -------------------------------------------------------------------------------
 # Name:        ElapsedTime
-# Purpose:     Measure the elapsed time between two events and print it in a human-readable format
+# Purpose:     Measure the elapsed time between two events and print it in a human-readable format, and keep a
+#              registry of the time spent in named (and nested) spans of code with a histogram per span.
 #
 # Author:      Gesuri
 #
 # Created:     August 14, 2024
-# Updated:     August 14, 2024
+# Updated:     October 17, 2026
 #
 # Copyright:   (c) Gesuri 2024
 # -------------------------------------------------------------------------------
 
+import json
 import datetime
+import threading
+import contextlib
+from time import perf_counter_ns
+from pathlib import Path
+
+# upper limits, in seconds, of the buckets of the histograms of the spans; the last bucket has no limit
+HISTOGRAM_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300)
 
 
 def td_format(td_object):
@@ -21,31 +30,42 @@ def td_format(td_object):
         td_object (datetime.timedelta): A timedelta object representing the elapsed time.
 
     Returns:
-        str: A string representing the elapsed time in years, months, days, hours, minutes, and seconds.
+        str: A string representing the elapsed time in years, months, days, hours, minutes, and seconds. The seconds
+            keep their decimals when the time is less than a minute, and a time less than a second is given in
+            milliseconds.
     """
-    # Convert the total seconds from the timedelta object into an integer.
-    seconds = int(td_object.total_seconds())
+    # Get the total seconds from the timedelta object, keeping the fraction of second.
+    total_seconds = td_object.total_seconds()
+    if total_seconds < 1:
+        milliseconds = round(total_seconds * 1000, 3)
+        return "%s millisecond%s" % (f'{milliseconds:g}', '' if milliseconds == 1 else 's')
 
-    # Define the periods in seconds for years, months, days, hours, minutes, and seconds.
+    # Define the periods in seconds for years, months, days, hours and minutes.
     periods = [
         ('year', 60 * 60 * 24 * 365),
         ('month', 60 * 60 * 24 * 30),
         ('day', 60 * 60 * 24),
         ('hour', 60 * 60),
         ('minute', 60),
-        ('second', 1),
     ]
 
+    seconds = int(total_seconds)
     strings = []
     # Loop through each period and calculate the number of each period in the total seconds.
     for period_name, period_seconds in periods:
-        if seconds > period_seconds:
+        if seconds >= period_seconds:
             # Calculate the number of periods and update the remaining seconds.
             period_value, seconds = divmod(seconds, period_seconds)
-            has_s = 's' if period_value >= 1 else ''
+            has_s = 's' if period_value > 1 else ''
             # Append the period and its count to the result string.
             strings.append("%s %s%s" % (period_value, period_name, has_s))
 
+    # The remaining seconds, with their decimals if there are no larger periods.
+    if not strings:
+        seconds = round(total_seconds, 3)
+    if seconds > 0:
+        strings.append("%s second%s" % (f'{seconds:g}', '' if seconds == 1 else 's'))
+
     # Join the periods into a single string and return it.
     return ", ".join(strings)
 
@@ -54,6 +74,9 @@ class ElapsedTime:
     """
     A class used to measure the elapsed time between two events.
 
+    The elapsed time is measured with the monotonic performance counter, so it is precise for short events and it is
+    not affected by changes of the clock of the system.
+
     Attributes:
         startTime (datetime.datetime): The time when the timer started.
         endTime (datetime.datetime): The time when the timer ended.
@@ -94,9 +117,10 @@ class ElapsedTime:
         if not self.endTime:
             # If endTime is not set, set it to the current time.
             self.endTime = self._current_()
+            self._endNs_ = perf_counter_ns()
 
-        # Calculate the time difference between startTime and endTime.
-        passedTime = self.endTime - self.startTime
+        # Calculate the time difference between start and end.
+        passedTime = datetime.timedelta(microseconds=(self._endNs_ - self._startNs_) / 1000)
 
         # Return the elapsed time as a string or timedelta object.
         if self.returnStr:
@@ -109,6 +133,7 @@ class ElapsedTime:
         Start or restart the timer by setting the startTime to the current time.
         """
         self.startTime = self._current_()
+        self._startNs_ = perf_counter_ns()
         self.endTime = None
 
     def end(self):
@@ -119,4 +144,125 @@ class ElapsedTime:
             str or datetime.timedelta: The elapsed time as a string or timedelta object based on the returnStr flag.
         """
         self.endTime = self._current_()
+        self._endNs_ = perf_counter_ns()
         return self.elapsed()
+
+
+class Timings:
+    """
+    A thread safe registry of the time spent in named spans of code.
+
+    The spans are opened with span(name) and can be nested: a span opened inside another one in the same thread is
+    recorded as 'outer/inner'. Every span keeps its count, total, minimum and maximum time in nanoseconds and a
+    histogram of its durations.
+
+    Attributes:
+        buckets (tuple of float): Upper limits, in seconds, of the buckets of the histograms.
+    """
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        """
+        The constructor for the Timings class.
+
+        Args:
+            buckets (tuple of float, optional): Upper limits, in seconds, of the buckets of the histograms. Defaults
+                to HISTOGRAM_BUCKETS.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._limits_ = [int(b * 1e9) for b in self.buckets]
+        self._spans_ = {}
+        self._lock_ = threading.Lock()
+        self._local_ = threading.local()
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """
+        Context manager that records the time spent inside it, nested in the span already open in the thread.
+
+        Args:
+            name (str): Name of the span.
+        """
+        stack = getattr(self._local_, 'stack', None)
+        if stack is None:
+            stack = self._local_.stack = []
+        stack.append(f'{stack[-1]}/{name}' if stack else name)
+        start = perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(stack.pop(), perf_counter_ns() - start)
+
+    def add(self, name, duration_ns):
+        """
+        Record a duration of a span measured elsewhere.
+
+        Args:
+            name (str): Full name of the span.
+            duration_ns (int): Duration in nanoseconds.
+        """
+        bucket = len(self._limits_)
+        for i, limit in enumerate(self._limits_):
+            if duration_ns <= limit:
+                bucket = i
+                break
+        with self._lock_:
+            span = self._spans_.get(name)
+            if span is None:
+                span = self._spans_[name] = {'count': 0, 'total_ns': 0, 'min_ns': duration_ns, 'max_ns': duration_ns,
+                                             'histogram': [0] * (len(self._limits_) + 1)}
+            span['count'] += 1
+            span['total_ns'] += duration_ns
+            span['min_ns'] = min(span['min_ns'], duration_ns)
+            span['max_ns'] = max(span['max_ns'], duration_ns)
+            span['histogram'][bucket] += 1
+
+    def stats(self):
+        """
+        Get the statistics of all the spans.
+
+        Returns:
+            dict: For every span, a dictionary with count, total_ns, min_ns, max_ns, mean_ns and histogram, the counts
+                of the durations in every bucket (the last one is for the durations over the last limit).
+        """
+        with self._lock_:
+            stats = {name: dict(span, histogram=list(span['histogram'])) for name, span in self._spans_.items()}
+        for span in stats.values():
+            span['mean_ns'] = span['total_ns'] // span['count']
+        return stats
+
+    def report(self):
+        """
+        Format the statistics as a text table sorted by span, one line per span with its histogram.
+
+        Returns:
+            str: The table.
+        """
+        def fmt(ns):
+            return td_format(datetime.timedelta(microseconds=ns / 1000))
+
+        labels = [f'<={b:g}s' for b in self.buckets] + [f'>{self.buckets[-1]:g}s']
+        lines = []
+        for name, span in sorted(self.stats().items()):
+            histogram = ' '.join(f'{label}:{n}' for label, n in zip(labels, span['histogram']) if n)
+            lines.append(f'{name}: {span["count"]} x {fmt(span["mean_ns"])} = {fmt(span["total_ns"])} '
+                         f'(min {fmt(span["min_ns"])}, max {fmt(span["max_ns"])}) [{histogram}]')
+        return '\n'.join(lines)
+
+    def export(self, path):
+        """
+        Write the statistics and the limits of the buckets to a JSON file.
+
+        Args:
+            path (str or Path): Path of the JSON file.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open('w') as f:
+            json.dump({'buckets': list(self.buckets), 'spans': self.stats()}, f, indent=2)
+
+    def clear(self):
+        """
+        Remove all the statistics.
+        """
+        with self._lock_:
+            self._spans_.clear()
@@ -57,6 +57,12 @@
 #       - `debug(self, line)`: Writes a debug log entry.
 #       - `fatal(self, line)`: Writes a fatal log entry.
 #       - `line(self, line)`: Writes a live log entry.
+#       - `flush(self)`: Waits until all the entries of the buffered mode are written to the file.
+#       - `close(self)`: Writes the pending entries of the buffered mode and closes the file.
+#
+#   5. With `buffered=True` the file is kept open and the entries are written by a background thread from a queue. The
+#       file is flushed every `flush_interval` seconds or every `flush_size` entries, and when the program exits. The
+#       entries are still printed to the standard output right away.
 #
 # The code also includes some helper methods (`_checkPath_` and `_checkName_`) that are used to validate the path and
 #   name of the log file and ensure they meet the requirements.
@@ -66,7 +72,11 @@
 # from os.path import splitext, basename
 from os import system, getcwd
 # from sys import argv
-from time import localtime
+from time import localtime, monotonic
+import sys
+import atexit
+import queue
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 from colorama import just_fix_windows_console
@@ -74,6 +84,8 @@ from colorama import just_fix_windows_console
 just_fix_windows_console()
 
 TIMESTAMP_FORMAT = '%Y%m%d_%H%M%S'
+FLUSH_INTERVAL = 1.0  # seconds between flushes of the buffered mode
+FLUSH_SIZE = 100  # entries written before a flush in the buffered mode
 
 
 def getStrTime(formato=None, utc=False, dst=False):
@@ -130,12 +142,16 @@ class Log:
           timestamp: boolean to indicate if add timestamp (True)
           fprint:    boolean, print in file, print in stdio (True)
           sprint:    boolean, print in stdio (True)
+          buffered:  boolean, keep the file open and write it from a background thread (False)
+          flush_interval: seconds between flushes of the buffered mode (FLUSH_INTERVAL)
+          flush_size: entries written before a flush in the buffered mode (FLUSH_SIZE)
     """
     path = None
 
     # name = None
 
-    def __init__(self, path=None, timestamp=True, fprint=True, sprint=True):
+    def __init__(self, path=None, timestamp=True, fprint=True, sprint=True, buffered=False,
+                 flush_interval=FLUSH_INTERVAL, flush_size=FLUSH_SIZE):
         self.sprint = sprint
         if path is None:
             path = getcwd()
@@ -144,6 +160,15 @@ class Log:
             self._checkPath_()
         self.timestamp = timestamp
         self.fprint = fprint
+        self.buffered = buffered
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._queue_ = None
+        self._writer_ = None
+        self._lock_ = threading.Lock()
+        if buffered:
+            # the pending entries are written when the program exits
+            atexit.register(self.close)
 
     def _checkPath_(self):
         if not self.path.exists():
@@ -184,6 +209,109 @@ class Log:
     def getFullPath(self):
         return self.path
 
+    def _open_(self, wo):
+        """ open the file, changing its owner if it is not possible. Returns None if it can not be opened """
+        if not self.path.is_file():
+            wo = 'w'
+        try:
+            return self.path.open(wo)
+        except IOError:
+            system(f'sudo chown pi:pi {self.path}')
+            try:
+                return self.path.open(wo)
+            except IOError:
+                return None
+
+    def _startWriter_(self):
+        """ start the background thread of the buffered mode, if it is not running """
+        with self._lock_:
+            if self._writer_ is None or not self._writer_.is_alive():
+                self._queue_ = queue.Queue()
+                self._writer_ = threading.Thread(target=self._writerLoop_, name=f'Log writer {self.path.name}',
+                                                 daemon=True)
+                self._writer_.start()
+
+    def _writerLoop_(self):
+        """ write the entries of the queue to the file, flushing it every flush_interval seconds or flush_size entries """
+        f = None
+        unwritable = False  # the file can not be opened, the entries are dropped
+        pending = 0
+        first_pending = 0.0
+        while True:
+            if pending == 0:
+                timeout = None  # nothing to flush, wait for the next entry
+            else:
+                timeout = max(0.0, self.flush_interval - (monotonic() - first_pending))
+            try:
+                item = self._queue_.get(timeout=timeout)
+            except queue.Empty:
+                item = False
+            try:
+                if isinstance(item, tuple):
+                    text, ow = item
+                    try:
+                        if (f is None and not unwritable) or ow:
+                            if f is not None:
+                                f.close()
+                            f = self._open_('w' if ow else 'a')
+                            if f is None and not unwritable:
+                                # reported once, not for every entry of the queue
+                                sys.stderr.write(f'Not possible to open the log {self.path}, its entries are not '
+                                                 f'written.\n')
+                            unwritable = f is None
+                        if f is not None:
+                            f.write(text)
+                            if pending == 0:
+                                first_pending = monotonic()
+                            pending += 1
+                    except Exception as e:
+                        f = self._writeFailed_(f, text, e)
+                        pending = 0
+                # item is None to close and 'flush' to force a flush
+                if f is not None and pending > 0 and (item is None or item == 'flush' or pending >= self.flush_size or
+                                                      monotonic() - first_pending >= self.flush_interval):
+                    try:
+                        f.flush()
+                    except Exception as e:
+                        f = self._writeFailed_(f, '', e)
+                    pending = 0
+                if item is None:
+                    if f is not None:
+                        try:
+                            f.close()
+                        except Exception as e:
+                            self._writeFailed_(f, '', e)
+                    return
+            finally:
+                # always, so flush() and close() never wait forever
+                if item is not False:
+                    self._queue_.task_done()
+
+    def _writeFailed_(self, f, text, error):
+        """ close the file after an error of the writer thread, writing the entry to stderr. Returns None, the file is
+            opened again for the next entry """
+        try:
+            f.close()
+        except Exception:
+            pass
+        sys.stderr.write(f'Error writing the log {self.path}: {error}\n{text}')
+        return None
+
+    def flush(self):
+        """ wait until all the entries of the buffered mode are written to the file """
+        if self._queue_ is not None and self._writer_ is not None and self._writer_.is_alive():
+            self._queue_.put('flush')
+            self._queue_.join()
+
+    def close(self):
+        """ write the pending entries of the buffered mode and close the file """
+        with self._lock_:
+            writer = self._writer_
+            self._writer_ = None
+        if writer is not None and writer.is_alive():
+            self._queue_.put(None)
+            writer.join()
+
     def w(self, line, ow=False, color=None):
         """ write the line into the file """
         if ow:
@@ -193,7 +321,9 @@ class Log:
         if type(line) != 'str':
             line = str(line)
         if len(line) > 0:
-            if self.fprint:
+            if self.fprint and self.buffered:
+                self._startWriter_()
+            elif self.fprint:
                 if not self.path.is_file():
                     f = self.path.open('w')
                 else:
@@ -221,9 +351,11 @@ class Log:
                 if line[-1] != '\n':
                     line += '\n'
                 if self.timestamp:
-                    f.write(f'{now},{line}')
-                else:
-                    f.write(line)
+                    line = f'{now},{line}'
+                if self.buffered:
+                    self._queue_.put((line, ow))
+                    return
+                f.write(line)
                 f.flush()
                 f.close()
 
@@ -0,0 +1,104 @@
+# -------------------------------------------------------------------------------
+# Name:        MetadataCache
+# Purpose:     In-process cache with time to live and least recently used eviction, used to keep the metadata of the
+#              SharePoint folders already listed.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import threading
+from time import monotonic
+from collections import OrderedDict
+
+CACHE_TTL = 60  # seconds
+CACHE_SIZE = 256  # entries
+
+
+class MetadataCache:
+    """
+    A thread safe cache where every entry expires after a time to live, and where the least recently used entry is
+    removed when the cache is full.
+
+    Attributes:
+        ttl (float): Seconds an entry is valid. If it is 0 or less, nothing is cached.
+        max_size (int): Maximum number of entries.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups not found or expired.
+    """
+
+    def __init__(self, ttl=CACHE_TTL, max_size=CACHE_SIZE):
+        """
+        The constructor for the MetadataCache class.
+
+        Args:
+            ttl (float, optional): Seconds an entry is valid. Defaults to CACHE_TTL.
+            max_size (int, optional): Maximum number of entries. Defaults to CACHE_SIZE.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries_ = OrderedDict()
+        self._lock_ = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries_)
+
+    def get(self, key):
+        """
+        Get the value of a key if it is in the cache and has not expired.
+
+        Args:
+            key: Key of the entry.
+
+        Returns:
+            The cached value, or None if it is not in the cache.
+        """
+        with self._lock_:
+            entry = self._entries_.get(key)
+            if entry is None or entry[0] < monotonic():
+                if entry is not None:
+                    del self._entries_[key]
+                self.misses += 1
+                return None
+            self._entries_.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        """
+        Add or replace an entry, removing the least recently used ones if the cache is full.
+
+        Args:
+            key: Key of the entry.
+            value: Value to cache.
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock_:
+            self._entries_[key] = (monotonic() + self.ttl, value)
+            self._entries_.move_to_end(key)
+            while len(self._entries_) > self.max_size:
+                self._entries_.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Remove an entry from the cache, if it is there.
+
+        Args:
+            key: Key of the entry.
+        """
+        with self._lock_:
+            self._entries_.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all the entries.
+        """
+        with self._lock_:
+            self._entries_.clear()
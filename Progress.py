@@ -0,0 +1,236 @@
+# -------------------------------------------------------------------------------
+# Name:        Progress
+# Purpose:     Aggregate the progress of many transfers running at the same time in one progress bar that is redrawn at
+#              most every interval seconds, or only count the bytes when it is disabled for headless runs.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import threading
+from time import monotonic
+from tqdm import tqdm
+
+PROGRESS_INTERVAL = 0.5  # seconds between redraws of the progress bar
+
+
+class Progress:
+    """
+    A thread safe progress of many transfers, shown as one progress bar with the bytes of all of them.
+
+    Every transfer gets a Transfer object with transfer(), and reports its bytes to it. The bar is created when the
+    first transfer starts and closed when the last one finishes, and it is redrawn at most every interval seconds, so
+    reporting the progress costs almost nothing in the transfer threads. The counters are kept until a new transfer
+    starts after that.
+
+    Attributes:
+        desc (str): Description shown at the left of the bar.
+        enabled (bool): If False nothing is drawn, the bytes are only counted.
+        interval (float): Minimum seconds between redraws.
+        total (int): Bytes of the transfers started or expected.
+        done (int): Bytes already transferred.
+        files (int): Number of transfers started.
+        finished (int): Number of transfers finished successfully.
+        failed (int): Number of transfers failed.
+    """
+
+    def __init__(self, desc='Transfer', enabled=True, interval=PROGRESS_INTERVAL):
+        """
+        The constructor for the Progress class.
+
+        Args:
+            desc (str, optional): Description shown at the left of the bar. Defaults to 'Transfer'.
+            enabled (bool, optional): If False nothing is drawn. Defaults to True.
+            interval (float, optional): Minimum seconds between redraws. Defaults to PROGRESS_INTERVAL.
+        """
+        self.desc = desc
+        self.enabled = enabled
+        self.interval = interval
+        self._lock_ = threading.Lock()
+        self._bar_ = None
+        self._drawn_ = 0.0
+        self._idle_ = False
+        self._reset_()
+
+    def _reset_(self):
+        """
+        Start counting from zero. Must be called with the lock acquired.
+        """
+        self._idle_ = False
+        self.total = 0
+        self.done = 0
+        self.files = 0
+        self.finished = 0
+        self.failed = 0
+        self._active_ = 0
+        self._expected_ = 0
+        self._name_ = None
+
+    def expect(self, size):
+        """
+        Add to the total the bytes of transfers that will start later, so the total is known from the beginning when
+        many files are transferred. The transfers started later take their size from these bytes.
+
+        Args:
+            size (int): Bytes of the transfers.
+        """
+        with self._lock_:
+            if self._idle_:
+                self._reset_()
+            self._expected_ += size
+            self.total += size
+            self._draw_(force=True)
+
+    def transfer(self, size, name=None):
+        """
+        Start a transfer.
+
+        Args:
+            size (int): Bytes of the transfer.
+            name (str, optional): Name of the file, shown in the bar.
+
+        Returns:
+            Transfer: Object where the transfer reports its progress.
+        """
+        with self._lock_:
+            if self._idle_:
+                self._reset_()
+            if self._expected_ >= size:
+                self._expected_ -= size
+            else:
+                self.total += size - self._expected_
+                self._expected_ = 0
+            self.files += 1
+            self._active_ += 1
+            self._name_ = name
+            self._draw_(force=True)
+        return Transfer(self, size)
+
+    def _update_(self, transfer, size):
+        """
+        Add transferred bytes of a transfer, negative if part of it is done again.
+        """
+        with self._lock_:
+            transfer.offset += size
+            self.done += size
+            self._draw_()
+
+    def _finish_(self, transfer, success):
+        """
+        Finish a transfer. A failed transfer is removed from the total.
+        """
+        with self._lock_:
+            self._active_ -= 1
+            if success:
+                self.finished += 1
+                self.done += transfer.size - transfer.offset
+            else:
+                self.failed += 1
+                self.total -= transfer.size
+                self.done -= transfer.offset
+            self._draw_(force=True)
+            if self._active_ == 0 and self._expected_ <= 0:
+                self._close_()
+
+    def _draw_(self, force=False):
+        """
+        Redraw the bar if interval seconds passed since the last redraw. Must be called with the lock acquired.
+        """
+        if not self.enabled:
+            return
+        now = monotonic()
+        if not force and now - self._drawn_ < self.interval:
+            return
+        self._drawn_ = now
+        if self._bar_ is None:
+            self._bar_ = tqdm(total=self.total, unit='B', unit_scale=True, desc=self.desc, ascii=True)
+        self._bar_.total = self.total
+        self._bar_.n = self.done
+        postfix = f'{self.finished}/{self.files} files'
+        if self.failed:
+            postfix += f', {self.failed} failed'
+        if self._active_ == 1 and self._name_:
+            postfix += f', {self._name_}'
+        self._bar_.set_postfix_str(postfix, refresh=False)
+        self._bar_.refresh()
+
+    def _close_(self):
+        """
+        Close the bar, the next transfer starts counting from zero. Must be called with the lock acquired.
+        """
+        if self._bar_ is not None:
+            self._bar_.close()
+            self._bar_ = None
+        self._idle_ = True
+
+    def snapshot(self):
+        """
+        Get the counters of the progress, for example to report them in a headless run.
+
+        Returns:
+            dict: total, done, files, finished and failed.
+        """
+        with self._lock_:
+            return {'total': self.total, 'done': self.done, 'files': self.files, 'finished': self.finished,
+                    'failed': self.failed}
+
+    def close(self):
+        """
+        Close the bar, even if there are transfers not finished.
+        """
+        with self._lock_:
+            if self._bar_ is not None:
+                self._draw_(force=True)
+            self._close_()
+
+
+class Transfer:
+    """
+    The progress of one transfer inside a Progress. It can be called with the number of bytes transferred so far, like
+    the chunk callbacks of the uploads and downloads.
+
+    Attributes:
+        size (int): Bytes of the transfer.
+        offset (int): Bytes transferred so far.
+    """
+
+    def __init__(self, progress, size):
+        self.progress = progress
+        self.size = size
+        self.offset = 0
+        self._finished_ = False
+
+    def __call__(self, offset):
+        """
+        Report the bytes transferred so far.
+
+        Args:
+            offset (int): Bytes transferred since the start of the file.
+        """
+        self.update(offset - self.offset)
+
+    def update(self, size):
+        """
+        Report the bytes transferred since the last report, negative if part of the transfer is done again. It can be
+        called from several threads.
+
+        Args:
+            size (int): Bytes transferred.
+        """
+        self.progress._update_(self, size)
+
+    def finish(self, success=True):
+        """
+        Finish the transfer. Only the first call counts.
+
+        Args:
+            success (bool, optional): If the transfer succeeded. Defaults to True.
+        """
+        if self._finished_:
+            return
+        self._finished_ = True
+        self.progress._finish_(self, success)
@@ -0,0 +1,238 @@
+# -------------------------------------------------------------------------------
+# Name:        RequestScheduler
+# Purpose:     Run the requests to SharePoint at the highest rate the service tolerates: limit the rate with a token
+#              bucket and the number of requests in flight, and retry throttled requests (HTTP 429 and 503) after the
+#              time asked by the server in Retry-After, or with exponential backoff and jitter.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import random
+import threading
+import datetime
+from time import monotonic, sleep
+from email.utils import parsedate_to_datetime
+import requests
+
+REQUEST_RATE = 20  # requests per second
+REQUEST_BURST = 40  # requests that can be sent at once after being idle
+MAX_CONCURRENCY = 16  # requests in flight at the same time
+MAX_RETRIES = 8  # retries of a throttled request
+BASE_DELAY = 1  # seconds, first delay of the exponential backoff
+MAX_DELAY = 120  # seconds, longest delay between retries
+THROTTLE_STATUS = (429, 503)
+
+_default_scheduler = None
+_default_lock = threading.Lock()
+
+
+def default_scheduler():
+    """
+    Returns the scheduler shared by all the SharePoint objects of the process, creating it the first time.
+
+    Returns:
+        RequestScheduler: The shared scheduler.
+    """
+    global _default_scheduler
+    with _default_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+
+def retry_after(response):
+    """
+    Get the seconds to wait from the Retry-After header of a response, given as seconds or as an HTTP date.
+
+    Args:
+        response (requests.Response): The response of the server.
+
+    Returns:
+        float or None: The seconds to wait, or None if the header is not there.
+    """
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.datetime.now(when.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestScheduler:
+    """
+    A thread safe scheduler of the requests to SharePoint.
+
+    Every request waits for a token of the bucket and for a free slot of the concurrency limit. When SharePoint
+    throttles a request, all the requests are paused for the time asked in Retry-After (or the backoff delay) and the
+    request is retried, up to max_retries times.
+
+    Attributes:
+        rate (float): Requests per second, None or 0 for no limit.
+        burst (int): Size of the token bucket.
+        max_concurrency (int): Requests in flight at the same time.
+        max_retries (int): Retries of a throttled request.
+        base_delay (float): First delay of the exponential backoff, in seconds.
+        max_delay (float): Longest delay between retries, in seconds.
+        throttled (int): Number of throttled responses received.
+    """
+
+    def __init__(self, rate=REQUEST_RATE, burst=REQUEST_BURST, max_concurrency=MAX_CONCURRENCY,
+                 max_retries=MAX_RETRIES, base_delay=BASE_DELAY, max_delay=MAX_DELAY):
+        """
+        The constructor for the RequestScheduler class. The arguments default to the constants of the module.
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttled = 0
+        self._tokens_ = float(self.burst)
+        self._updated_ = monotonic()
+        self._paused_until_ = 0.0
+        self._lock_ = threading.Lock()
+        self._local_ = threading.local()
+        self._slots_ = threading.BoundedSemaphore(self.max_concurrency)
+
+    def backoff_delay(self, attempt):
+        """
+        Get the delay before a retry: exponential with the attempt number, with jitter so the retries of many workers
+        do not arrive together.
+
+        Args:
+            attempt (int): Number of the retry, starting at 0.
+
+        Returns:
+            float: Seconds to wait.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def retries(self):
+        """
+        Get the number of retries done by the current thread, in run() or with wait(). The difference between two calls
+        is the number of retries of the operation in between.
+
+        Returns:
+            int: Retries of the current thread.
+        """
+        return getattr(self._local_, 'retries', 0)
+
+    def wait(self, attempt):
+        """
+        Sleep the backoff delay before retrying an operation outside run(), counting it in the retries of the thread.
+
+        Args:
+            attempt (int): Number of the retry, starting at 0.
+        """
+        self._local_.retries = self.retries() + 1
+        sleep(self.backoff_delay(attempt))
+
+    def pause(self, seconds):
+        """
+        Stop sending requests for some seconds, for example when SharePoint throttles a request.
+
+        Args:
+            seconds (float): Seconds without sending requests.
+        """
+        with self._lock_:
+            self._paused_until_ = max(self._paused_until_, monotonic() + seconds)
+
+    def _take_token_(self):
+        """
+        Wait until the scheduler is not paused and there is a token in the bucket, and take it.
+        """
+        while True:
+            with self._lock_:
+                now = monotonic()
+                wait = self._paused_until_ - now
+                if wait <= 0:
+                    if not self.rate:
+                        return
+                    self._tokens_ = min(self.burst, self._tokens_ + (now - self._updated_) * self.rate)
+                    self._updated_ = now
+                    if self._tokens_ >= 1:
+                        self._tokens_ -= 1
+                        return
+                    wait = (1 - self._tokens_) / self.rate
+            sleep(wait)
+
+    @staticmethod
+    def _is_transient_(error):
+        """
+        Check if an error is a throttled response or a network error worth retrying.
+
+        Returns:
+            tuple: (bool, response) if the request should be retried, and the response of the server if there is one.
+        """
+        response = getattr(error, 'response', None)
+        if response is not None and getattr(response, 'status_code', None) in THROTTLE_STATUS:
+            return True, response
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+            return True, None
+        return False, response
+
+    def run(self, func, *args, log=None, **kwargs):
+        """
+        Run a function that sends requests to SharePoint, when the rate and the concurrency limits allow it, retrying
+        it while SharePoint throttles it.
+
+        Args:
+            func (callable): Function to run. It must be safe to call it again after a throttled response.
+            log (Log.Log, optional): Log where the throttled requests are reported.
+            args, kwargs: Arguments of the function.
+
+        Returns:
+            The value returned by the function. The error is raised if it is not a throttled response or if there are no
+                retries left.
+        """
+        attempt = 0
+        while True:
+            self._take_token_()
+            with self._slots_:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    transient, response = self._is_transient_(e)
+                    if not transient or attempt >= self.max_retries:
+                        raise
+                    error = e
+            delay = retry_after(response)
+            if delay is None:
+                delay = self.backoff_delay(attempt)
+            if response is not None:
+                with self._lock_:
+                    self.throttled += 1
+                # all the requests wait, sending more would only make SharePoint throttle harder
+                self.pause(delay)
+            if log is not None:
+                log.warn(f'Request throttled or failed ({error}), retrying in {round(delay, 1)} s '
+                         f'({attempt + 1}/{self.max_retries})')
+            self._local_.retries = self.retries() + 1
+            sleep(delay)
+            attempt += 1
+
+
+def is_transient(error):
+    """
+    Check if an error is a throttled response or a network error, the errors the scheduler retries.
+
+    Args:
+        error (Exception): Error raised by a request.
+
+    Returns:
+        bool: True if the scheduler retries the error.
+    """
+    return RequestScheduler._is_transient_(error)[0]
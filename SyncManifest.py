@@ -0,0 +1,217 @@
+# -------------------------------------------------------------------------------
+# Name:        SyncManifest
+# Purpose:     Keep an on-disk record (SQLite) of the local files already uploaded to SharePoint, so each run only
+#              uploads the files that are new or changed since the last successful upload, with the content hash of
+#              the uploaded files to skip the ones that were touched but have the same content.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import os
+import sqlite3
+import hashlib
+import datetime
+import threading
+from pathlib import Path
+
+MANIFEST_NAME = 'sync_manifest.db'
+HASH_ALGORITHM = 'sha256'
+HASH_BLOCK_SIZE = 1024 * 1024  # bytes read at a time to compute the content hash
+
+# remote states of a file
+STATE_UPLOADED = 'uploaded'
+STATE_FAILED = 'failed'
+
+_COLUMNS = ('path', 'size', 'mtime_ns', 'remote_url', 'remote_state', 'updated', 'content_hash')
+
+
+def file_hash(path, algorithm=HASH_ALGORITHM, block_size=HASH_BLOCK_SIZE):
+    """
+    Compute the content hash of a file, reading it by blocks so the memory used does not depend on its size.
+
+    Args:
+        path (str or Path): Path of the file.
+        algorithm (str, optional): Name of the hashlib algorithm. Defaults to HASH_ALGORITHM.
+        block_size (int, optional): Bytes read at a time. Defaults to HASH_BLOCK_SIZE.
+
+    Returns:
+        str: The hash as '<algorithm>:<hex digest>'.
+    """
+    h = hashlib.new(algorithm)
+    with Path(path).open('rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            h.update(block)
+    return f'{algorithm}:{h.hexdigest()}'
+
+
+class SyncManifest:
+    """
+    A class used to record the size, modification time and remote state of every local file that is synced.
+
+    A file is considered changed (and needs to be uploaded) when it is not in the manifest, when its size or its
+    modification time are different from the ones recorded, or when its last upload failed. The content hash of the
+    file when it was uploaded can also be recorded, so a file with a new modification time but the same content is
+    not uploaded again (see SharePoint.upload_large_file with skip_unchanged).
+
+    The manifest can be used from several threads.
+
+    Attributes:
+        path (Path): Path of the SQLite file with the manifest.
+        conn (sqlite3.Connection): Connection to the manifest.
+    """
+
+    def __init__(self, path=None):
+        """
+        The constructor for the SyncManifest class.
+
+        Args:
+            path (str or Path, optional): Path of the manifest file. If it is a directory, MANIFEST_NAME is used inside
+                it. Defaults to MANIFEST_NAME in the current working directory.
+        """
+        if path is None:
+            path = Path(os.getcwd(), MANIFEST_NAME)
+        self.path = Path(path)
+        if self.path.is_dir():
+            self.path = self.path.joinpath(MANIFEST_NAME)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_ = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS files (
+                                path TEXT PRIMARY KEY,
+                                size INTEGER NOT NULL,
+                                mtime_ns INTEGER NOT NULL,
+                                remote_url TEXT,
+                                remote_state TEXT,
+                                updated TEXT,
+                                content_hash TEXT)''')
+        # manifests created before the content hash was recorded
+        if 'content_hash' not in [row[1] for row in self.conn.execute('PRAGMA table_info(files)')]:
+            self.conn.execute('ALTER TABLE files ADD COLUMN content_hash TEXT')
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Close the connection to the manifest.
+        """
+        with self._lock_:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def get(self, path):
+        """
+        Get the record of a local file.
+
+        Args:
+            path (str or Path): Local path of the file.
+
+        Returns:
+            dict or None: The record (path, size, mtime_ns, remote_url, remote_state, updated, content_hash), or None
+                if the file is not in the manifest.
+        """
+        with self._lock_:
+            row = self.conn.execute(f'SELECT {", ".join(_COLUMNS)} FROM files WHERE path = ?',
+                                    (Path(path).as_posix(),)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(_COLUMNS, row))
+
+    def content_hash(self, path):
+        """
+        Get the content hash of a local file. The hash recorded in the manifest is used if the size and modification
+        time of the file did not change, otherwise it is computed.
+
+        Args:
+            path (str or Path): Local path of the file.
+
+        Returns:
+            str: The hash, see file_hash.
+        """
+        record = self.get(path)
+        st = Path(path).stat()
+        if record is not None and record['content_hash'] and (record['size'], record['mtime_ns']) == \
+                (st.st_size, st.st_mtime_ns):
+            return record['content_hash']
+        return file_hash(path)
+
+    def changed(self, files):
+        """
+        Filter the files that are new or changed since they were uploaded.
+
+        Args:
+            files (iterable of str or Path): Local files to check.
+
+        Returns:
+            list of Path: The files that need to be uploaded.
+        """
+        with self._lock_:
+            rows = self.conn.execute('SELECT path, size, mtime_ns, remote_state FROM files').fetchall()
+        known = {row[0]: row[1:] for row in rows}
+        changed = []
+        for f in files:
+            f = Path(f)
+            st = f.stat()
+            record = known.get(f.as_posix())
+            if record is None or record != (st.st_size, st.st_mtime_ns, STATE_UPLOADED):
+                changed.append(f)
+        return changed
+
+    def mark(self, path, remote_url=None, remote_state=STATE_UPLOADED, commit=True, content_hash=None):
+        """
+        Record the current size and modification time of a local file with its remote state.
+
+        Args:
+            path (str or Path): Local path of the file.
+            remote_url (str or Path, optional): Where the file is in SharePoint.
+            remote_state (str, optional): STATE_UPLOADED or STATE_FAILED. Defaults to STATE_UPLOADED.
+            commit (bool, optional): Commit the change right away. Defaults to True.
+            content_hash (str, optional): Content hash of the file. If it is not given, the hash already recorded is
+                kept while the size and modification time of the file are the same.
+        """
+        path = Path(path)
+        st = path.stat()
+        if remote_url is not None:
+            remote_url = Path(remote_url).as_posix()
+        with self._lock_:
+            self.conn.execute('INSERT INTO files (path, size, mtime_ns, remote_url, remote_state, updated, '
+                              'content_hash) VALUES (?, ?, ?, ?, ?, ?, ?) '
+                              'ON CONFLICT(path) DO UPDATE SET remote_url = excluded.remote_url, '
+                              'remote_state = excluded.remote_state, updated = excluded.updated, '
+                              'content_hash = CASE WHEN excluded.content_hash IS NULL AND size = excluded.size '
+                              'AND mtime_ns = excluded.mtime_ns THEN content_hash ELSE excluded.content_hash END, '
+                              'size = excluded.size, mtime_ns = excluded.mtime_ns',
+                              (path.as_posix(), st.st_size, st.st_mtime_ns, remote_url, remote_state,
+                               datetime.datetime.now().isoformat(timespec='seconds'), content_hash))
+            if commit:
+                self.conn.commit()
+
+    def mark_uploaded(self, path, remote_url=None, content_hash=None):
+        """
+        Record that a local file was uploaded successfully, optionally with its content hash.
+        """
+        self.mark(path, remote_url, STATE_UPLOADED, content_hash=content_hash)
+
+    def mark_failed(self, path, remote_url=None):
+        """
+        Record that the upload of a local file failed, so it is tried again in the next run.
+        """
+        self.mark(path, remote_url, STATE_FAILED)
+
+    def forget(self, path):
+        """
+        Remove a local file from the manifest, so it is uploaded again in the next run.
+        """
+        with self._lock_:
+            self.conn.execute('DELETE FROM files WHERE path = ?', (Path(path).as_posix(),))
+            self.conn.commit()
@@ -0,0 +1,113 @@
+# -------------------------------------------------------------------------------
+# Name:        TokenCache
+# Purpose:     Keep the access tokens of SharePoint in a local file until they expire, so short runs of the scripts
+#              reuse the same token instead of authenticating every time.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import os
+import json
+import threading
+from time import time
+from pathlib import Path
+
+TOKEN_CACHE_PATH = Path.home().joinpath('.mssp_token_cache.json')
+EXPIRY_MARGIN = 300  # seconds, a token that expires in less than this is not used
+
+
+class TokenCache:
+    """
+    A thread safe cache of access tokens stored in a JSON file that only the owner can read.
+
+    Attributes:
+        path (Path): Path of the JSON file with the tokens.
+        margin (float): Seconds before the expiration when a token is no longer returned.
+    """
+
+    def __init__(self, path=None, margin=EXPIRY_MARGIN):
+        """
+        The constructor for the TokenCache class.
+
+        Args:
+            path (str or Path, optional): Path of the JSON file. Defaults to TOKEN_CACHE_PATH.
+            margin (float, optional): Seconds before the expiration when a token is no longer returned. Defaults to
+                EXPIRY_MARGIN.
+        """
+        if path is None:
+            path = TOKEN_CACHE_PATH
+        self.path = Path(path)
+        self.margin = margin
+        self._lock_ = threading.Lock()
+
+    def _read_(self):
+        """
+        Read all the tokens in the file. Must be called with the lock acquired.
+        """
+        try:
+            with self.path.open('r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_(self, tokens):
+        """
+        Replace the file with the given tokens. Must be called with the lock acquired.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f'{self.path.name}.tmp')
+        # the file is created readable only by the owner, the tokens give access to SharePoint
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(tokens, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        """
+        Get a token that is still valid.
+
+        Args:
+            key (str): Key of the token, for example the client id and the site.
+
+        Returns:
+            dict or None: The token (access_token, token_type, expires_on), or None if there is no token or it expires
+                within the margin.
+        """
+        with self._lock_:
+            token = self._read_().get(key)
+        if token is None or token.get('expires_on', 0) - self.margin < time():
+            return None
+        return token
+
+    def put(self, key, access_token, token_type, expires_on):
+        """
+        Save a token, removing the ones already expired.
+
+        Args:
+            key (str): Key of the token.
+            access_token (str): The access token.
+            token_type (str): Type of the token, usually 'Bearer'.
+            expires_on (float): Expiration time of the token as a POSIX timestamp.
+        """
+        with self._lock_:
+            tokens = {k: v for k, v in self._read_().items() if v.get('expires_on', 0) > time()}
+            tokens[key] = {'access_token': access_token, 'token_type': token_type, 'expires_on': float(expires_on)}
+            self._write_(tokens)
+
+    def remove(self, key):
+        """
+        Remove a token, for example when SharePoint rejects it.
+
+        Args:
+            key (str): Key of the token.
+        """
+        with self._lock_:
+            tokens = self._read_()
+            if tokens.pop(key, None) is None:
+                return
+            self._write_(tokens)
@@ -0,0 +1,233 @@
+# -------------------------------------------------------------------------------
+# Name:        TransferMetrics
+# Purpose:     Record one structured event (JSON lines) for every operation with SharePoint: the operation, path,
+#              bytes, duration, retries and outcome, and summarize the events of a run with throughput percentiles, so
+#              it is possible to see where the transfer time goes.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+# usage:
+#   python TransferMetrics.py transfer_metrics.jsonl [run]
+# prints the summary of the last run in the file, or of the given run
+
+import os
+import sys
+import json
+import datetime
+import threading
+from pathlib import Path
+
+METRICS_NAME = 'transfer_metrics.jsonl'
+PERCENTILES = (50, 90, 99)
+
+# outcomes of an operation
+OUTCOME_OK = 'ok'
+OUTCOME_FAILED = 'failed'
+OUTCOME_SKIPPED = 'skipped'  # the file was not transferred because it was unchanged
+
+
+class TransferMetrics:
+    """
+    A thread safe sink of transfer events, written as one JSON object per line to a file that is only appended.
+
+    Every event has the fields time, run, operation, path, bytes, duration (seconds), retries and outcome. All the
+    events written by the same TransferMetrics object have the same run, so the runs can be summarized separately.
+
+    Attributes:
+        path (Path): Path of the JSON lines file.
+        run (str): Id of the run, the start time of the object.
+    """
+
+    def __init__(self, path=None, run=None):
+        """
+        The constructor for the TransferMetrics class.
+
+        Args:
+            path (str or Path, optional): Path of the JSON lines file. Defaults to METRICS_NAME in the current working
+                directory.
+            run (str, optional): Id of the run. Defaults to the current time.
+        """
+        if path is None:
+            path = Path(os.getcwd(), METRICS_NAME)
+        self.path = Path(path)
+        self.run = run if run is not None else datetime.datetime.now().isoformat(timespec='seconds')
+        self._file_ = None
+        self._lock_ = threading.Lock()
+
+    def record(self, operation, path, size=0, duration=0.0, retries=0, outcome=OUTCOME_OK):
+        """
+        Write the event of one operation.
+
+        Args:
+            operation (str): Type of operation, for example 'upload' or 'download'.
+            path (str or Path): Path of the file or folder in SharePoint.
+            size (int, optional): Bytes transferred. Defaults to 0.
+            duration (float, optional): Seconds the operation took, including its retries. Defaults to 0.
+            retries (int, optional): Number of retries of the operation. Defaults to 0.
+            outcome (str, optional): OUTCOME_OK, OUTCOME_FAILED or OUTCOME_SKIPPED. Defaults to OUTCOME_OK.
+        """
+        event = {
+            'time': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'run': self.run,
+            'operation': operation,
+            'path': Path(path).as_posix() if path is not None else None,
+            'bytes': int(size or 0),
+            'duration': round(duration, 6),
+            'retries': retries,
+            'outcome': outcome
+        }
+        line = json.dumps(event) + '\n'
+        with self._lock_:
+            if self._file_ is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file_ = self.path.open('a')
+            self._file_.write(line)
+            self._file_.flush()
+
+    def close(self):
+        """
+        Close the JSON lines file.
+        """
+        with self._lock_:
+            if self._file_ is not None:
+                self._file_.close()
+                self._file_ = None
+
+    def summary(self):
+        """
+        Summarize the events of this run written so far.
+
+        Returns:
+            dict: The summary of every operation, see summarize.
+        """
+        with self._lock_:
+            if self._file_ is not None:
+                self._file_.flush()
+        return summarize(read_events(self.path, self.run))
+
+
+def read_events(path, run=None):
+    """
+    Read the events of a JSON lines file. Lines that are not valid JSON are skipped.
+
+    Args:
+        path (str or Path): Path of the JSON lines file.
+        run (str, optional): Only return the events of this run. Use 'last' for the last run in the file. Defaults to
+            all the runs.
+
+    Returns:
+        list of dict: The events.
+    """
+    events = []
+    with Path(path).open('r') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    if run == 'last' and events:
+        run = events[-1].get('run')
+    if run is not None:
+        events = [e for e in events if e.get('run') == run]
+    return events
+
+
+def percentile(values, p):
+    """
+    Get a percentile of a list of values, interpolating between the closest ranks.
+
+    Args:
+        values (list of float): The values.
+        p (float): Percentile between 0 and 100.
+
+    Returns:
+        float or None: The percentile, or None if there are no values.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (k - low)
+
+
+def summarize(events, percentiles=PERCENTILES):
+    """
+    Summarize the events by operation.
+
+    Args:
+        events (iterable of dict): The events, as returned by read_events.
+        percentiles (tuple of float, optional): Percentiles of the throughput and the duration. Defaults to
+            PERCENTILES.
+
+    Returns:
+        dict: For every operation, a dictionary with count, succeeded, failed, skipped, retries, bytes, duration (sum
+            of the durations), mb_per_second (total bytes over total duration) and the percentiles of the throughput
+            (mb_per_second_p50, ...) and of the duration (duration_p50, ...) of the successful operations.
+    """
+    groups = {}
+    for e in events:
+        groups.setdefault(e.get('operation'), []).append(e)
+    summary = {}
+    for operation, group in groups.items():
+        ok = [e for e in group if e.get('outcome') == OUTCOME_OK]
+        total_bytes = sum(e.get('bytes', 0) for e in ok)
+        total_duration = sum(e.get('duration', 0) for e in group)
+        durations = [e.get('duration', 0) for e in ok]
+        throughputs = [e['bytes'] / (1024 * 1024) / e['duration'] for e in ok
+                       if e.get('bytes') and e.get('duration')]
+        stats = {
+            'count': len(group),
+            'succeeded': len(ok),
+            'failed': sum(1 for e in group if e.get('outcome') == OUTCOME_FAILED),
+            'skipped': sum(1 for e in group if e.get('outcome') == OUTCOME_SKIPPED),
+            'retries': sum(e.get('retries', 0) for e in group),
+            'bytes': total_bytes,
+            'duration': total_duration,
+            'mb_per_second': total_bytes / (1024 * 1024) / total_duration if total_duration > 0 else 0
+        }
+        for p in percentiles:
+            stats[f'mb_per_second_p{p}'] = percentile(throughputs, p)
+            stats[f'duration_p{p}'] = percentile(durations, p)
+        summary[operation] = stats
+    return summary
+
+
+def format_summary(summary, percentiles=PERCENTILES):
+    """
+    Format a summary as a text table, one line per operation.
+
+    Args:
+        summary (dict): The summary returned by summarize.
+        percentiles (tuple of float, optional): Percentiles to show. Defaults to PERCENTILES.
+
+    Returns:
+        str: The table.
+    """
+    def fmt(value):
+        return '-' if value is None else f'{value:.2f}'
+
+    header = ['operation', 'count', 'failed', 'skipped', 'retries', 'MB', 'seconds', 'MB/s'] + \
+             [f'MB/s p{p}' for p in percentiles] + [f's p{p}' for p in percentiles]
+    rows = [header]
+    for operation, s in sorted(summary.items(), key=lambda item: -item[1]['duration']):
+        rows.append([str(operation), str(s['count']), str(s['failed']), str(s.get('skipped', 0)), str(s['retries']),
+                     fmt(s['bytes'] / (1024 * 1024)), fmt(s['duration']), fmt(s['mb_per_second'])] +
+                    [fmt(s[f'mb_per_second_p{p}']) for p in percentiles] +
+                    [fmt(s[f'duration_p{p}']) for p in percentiles])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join('  '.join(cell.rjust(widths[i]) for i, cell in enumerate(row)) for row in rows)
+
+
+if __name__ == '__main__':
+    events = read_events(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else 'last')
+    if events:
+        print(f'Run {events[0].get("run")}: {len(events)} operations')
+    print(format_summary(summarize(events)))
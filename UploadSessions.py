@@ -0,0 +1,151 @@
+# -------------------------------------------------------------------------------
+# Name:        UploadSessions
+# Purpose:     Keep on disk (SQLite) the state of the chunked uploads in progress, so a failed or interrupted upload
+#              can continue from the last chunk acknowledged by SharePoint instead of starting from the first byte.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import os
+import sqlite3
+import datetime
+import threading
+from pathlib import Path
+
+UPLOAD_SESSIONS_NAME = 'upload_sessions.db'
+UPLOAD_SESSIONS_MEMORY = ':memory:'  # path of a store kept only in memory, for the life of the object
+
+
+class UploadSessions:
+    """
+    A thread safe store of the chunked upload sessions in progress.
+
+    Every session is identified by the server relative URL of the target file and stores the upload id, the offset
+    already committed in SharePoint and the fingerprint (path, size and modification time) of the local file. A
+    session is only resumed if the local file still has the same fingerprint.
+
+    Attributes:
+        path (Path): Path of the SQLite file with the sessions. The file is created the first time it is used. With
+            UPLOAD_SESSIONS_MEMORY the sessions are only kept in memory.
+    """
+
+    def __init__(self, path=None):
+        """
+        The constructor for the UploadSessions class.
+
+        Args:
+            path (str or Path, optional): Path of the SQLite file, or UPLOAD_SESSIONS_MEMORY to keep the sessions only
+                in memory. Defaults to UPLOAD_SESSIONS_NAME in the current working directory.
+        """
+        if path is None:
+            path = Path(os.getcwd(), UPLOAD_SESSIONS_NAME)
+        self.path = Path(path)
+        self._conn_ = None
+        self._lock_ = threading.Lock()
+
+    def _connection_(self):
+        """
+        Open the SQLite file the first time it is needed. Must be called with the lock acquired.
+        """
+        if self._conn_ is None:
+            if str(self.path) != UPLOAD_SESSIONS_MEMORY:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn_ = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn_.execute('''CREATE TABLE IF NOT EXISTS sessions (
+                                       target_url TEXT PRIMARY KEY,
+                                       local_path TEXT NOT NULL,
+                                       size INTEGER NOT NULL,
+                                       mtime_ns INTEGER NOT NULL,
+                                       upload_id TEXT NOT NULL,
+                                       offset INTEGER NOT NULL,
+                                       updated TEXT)''')
+            self._conn_.commit()
+        return self._conn_
+
+    @staticmethod
+    def _fingerprint_(local_path):
+        st = Path(local_path).stat()
+        return Path(local_path).resolve().as_posix(), st.st_size, st.st_mtime_ns
+
+    def get(self, target_url, local_path):
+        """
+        Get the session of a target file if it was started with the same local file.
+
+        Args:
+            target_url (str): Server relative URL of the target file.
+            local_path (str or Path): Local file being uploaded.
+
+        Returns:
+            dict or None: The session (upload_id, offset), or None if there is no session for this local file. A
+                session started with a different or modified local file is removed.
+        """
+        fingerprint = self._fingerprint_(local_path)
+        with self._lock_:
+            conn = self._connection_()
+            row = conn.execute('SELECT local_path, size, mtime_ns, upload_id, offset FROM sessions '
+                               'WHERE target_url = ?', (target_url,)).fetchone()
+            if row is None:
+                return None
+            if tuple(row[:3]) != fingerprint:
+                conn.execute('DELETE FROM sessions WHERE target_url = ?', (target_url,))
+                conn.commit()
+                return None
+            return {'upload_id': row[3], 'offset': row[4]}
+
+    def start(self, target_url, local_path, upload_id):
+        """
+        Record a new session for a target file, replacing any previous one.
+
+        Args:
+            target_url (str): Server relative URL of the target file.
+            local_path (str or Path): Local file being uploaded.
+            upload_id (str): Id of the upload session.
+        """
+        local_path, size, mtime_ns = self._fingerprint_(local_path)
+        with self._lock_:
+            conn = self._connection_()
+            conn.execute('INSERT OR REPLACE INTO sessions (target_url, local_path, size, mtime_ns, upload_id, offset, '
+                         'updated) VALUES (?, ?, ?, ?, ?, 0, ?)',
+                         (target_url, local_path, size, mtime_ns, upload_id,
+                          datetime.datetime.now().isoformat(timespec='seconds')))
+            conn.commit()
+
+    def update(self, target_url, offset):
+        """
+        Record the offset committed in SharePoint for a session.
+
+        Args:
+            target_url (str): Server relative URL of the target file.
+            offset (int): Number of bytes already acknowledged by SharePoint.
+        """
+        with self._lock_:
+            conn = self._connection_()
+            conn.execute('UPDATE sessions SET offset = ?, updated = ? WHERE target_url = ?',
+                         (offset, datetime.datetime.now().isoformat(timespec='seconds'), target_url))
+            conn.commit()
+
+    def remove(self, target_url):
+        """
+        Remove the session of a target file, when it is finished or can not be resumed.
+
+        Args:
+            target_url (str): Server relative URL of the target file.
+        """
+        with self._lock_:
+            conn = self._connection_()
+            conn.execute('DELETE FROM sessions WHERE target_url = ?', (target_url,))
+            conn.commit()
+
+    def close(self):
+        """
+        Close the SQLite file.
+        """
+        with self._lock_:
+            if self._conn_ is not None:
+                self._conn_.close()
+                self._conn_ = None
@@ -0,0 +1,209 @@
+# -------------------------------------------------------------------------------
+# Name:        run_benchmarks
+# Purpose:     Measure the throughput of the SharePoint driver (files/s and MB/s) in the listing, small-file upload,
+#              batched small-file upload, large-file upload and download scenarios against the local SharePoint
+#              stand-in of sharepoint_stub, with configurable latency, bandwidth and throttling, so changes in the
+#              driver can be compared.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+# usage:
+#   python benchmarks/run_benchmarks.py [--latency 0.05] [--bandwidth 10] [--throttle-every 50] [--json results.json]
+#   python benchmarks/run_benchmarks.py --help
+# runs all the scenarios, or the ones given with --scenarios, and prints a table with the results
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import office365_api
+import Log
+import TokenCache
+import RequestScheduler
+import sharepoint_stub
+
+SCENARIOS = ('listing', 'small_upload', 'batch_upload', 'large_upload', 'download')
+CLIENT_ID = 'benchmark'
+
+
+def connect(stub, workdir, rate, max_workers):
+    """
+    Create a SharePoint object for the stub. The token is put in a token cache beforehand, so there is no
+    authentication with Microsoft.
+
+    Args:
+        stub (SharePointStub): The running stub.
+        workdir (Path): Folder for the token cache, the upload sessions and the log.
+        rate (float): Requests per second of the scheduler.
+        max_workers (int): Number of workers, also the concurrency of the scheduler.
+
+    Returns:
+        office365_api.SharePoint: The connection.
+    """
+    token_cache = TokenCache.TokenCache(Path(workdir, 'tokens.json'))
+    token_cache.put(f'{CLIENT_ID}@{stub.site_url}', 'benchmark', 'Bearer', time.time() + 24 * 3600)
+    scheduler = RequestScheduler.RequestScheduler(rate=rate, burst=max(rate, 1),
+                                                  max_concurrency=max(max_workers, RequestScheduler.MAX_CONCURRENCY))
+    return office365_api.SharePoint(username='', password='', client_id=CLIENT_ID, client_secret='benchmark',
+                                    sharepoint_site=stub.site_url, sharepoint_site_name=stub.site_name,
+                                    sharepoint_doc=stub.doc_library,
+                                    log=Log.Log(Path(workdir, 'benchmark.log'), sprint=False, buffered=True),
+                                    upload_sessions=Path(workdir, 'upload_sessions.db'), token_cache=token_cache,
+                                    scheduler=scheduler, progress=False)
+
+
+def write_files(folder, count, size, prefix):
+    """
+    Write count local files of size bytes.
+
+    Returns:
+        list of Path: The files.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    block = bytes(range(256)) * (size // 256 + 1)
+    files = []
+    for i in range(count):
+        path = folder.joinpath(f'{prefix}_{i:05d}.bin')
+        path.write_bytes(block[:size])
+        files.append(path)
+    return files
+
+
+def bench_listing(sp, stub, args, workdir):
+    for i in range(args.list_files):
+        stub.add_file(f'listing/folder_{i % args.list_folders:03d}/file_{i:05d}.txt', b'x')
+    start = perf_counter()
+    files = sum(1 for _ in sp.walk('listing', max_workers=args.workers))
+    return files, 0, perf_counter() - start
+
+
+def bench_upload(sp, args, workdir, name, count, size):
+    files = write_files(Path(workdir, name), count, size, name)
+    start = perf_counter()
+    results, summary = sp.upload_large_files([(f, f'{name}/{f.name}') for f in files], chunk_size=args.chunk_size,
+                                             max_workers=args.workers, show_progress=False)
+    elapsed = perf_counter() - start
+    ok = [r for r in results if r['success']]
+    return len(ok), sum(r['file_size'] for r in ok), elapsed
+
+
+def bench_small_upload(sp, stub, args, workdir):
+    return bench_upload(sp, args, workdir, 'small_upload', args.small_files, args.small_size)
+
+
+def bench_batch_upload(sp, stub, args, workdir):
+    files = write_files(Path(workdir, 'batch_upload'), args.small_files, args.small_size, 'batch_upload')
+    start = perf_counter()
+    sp.ensure_folder_exists('batch_upload')
+    results = sp.upload_files_batch([(f.name, f) for f in files], 'batch_upload', batch_size=args.batch_size)
+    elapsed = perf_counter() - start
+    ok = sum(1 for r in results if r['success'])
+    return ok, ok * args.small_size, elapsed
+
+
+def bench_large_upload(sp, stub, args, workdir):
+    return bench_upload(sp, args, workdir, 'large_upload', args.large_files, args.large_size)
+
+
+def bench_download(sp, stub, args, workdir):
+    content = bytes(range(256)) * (args.large_size // 256 + 1)
+    names = [f'download_{i:05d}.bin' for i in range(args.large_files)]
+    for name in names:
+        stub.add_file(f'download/{name}', content[:args.large_size])
+    destination = Path(workdir, 'download')
+    destination.mkdir(parents=True, exist_ok=True)
+    start = perf_counter()
+    files = 0
+    for name in names:
+        if sp.download_large_file(name, 'download', destination.joinpath(name), max_workers=args.workers,
+                                  range_size=args.chunk_size, show_progress=False):
+            files += 1
+    return files, files * args.large_size, perf_counter() - start
+
+
+def run(args):
+    """
+    Run the scenarios, each one with the stub empty.
+
+    Returns:
+        list of dict: For every scenario: scenario, files, bytes, seconds, files_per_second, mb_per_second, requests
+            and throttled (requests answered by the stub).
+    """
+    benchmarks = {'listing': bench_listing, 'small_upload': bench_small_upload, 'batch_upload': bench_batch_upload,
+                  'large_upload': bench_large_upload, 'download': bench_download}
+    results = []
+    stub = sharepoint_stub.SharePointStub(latency=args.latency,
+                                          bandwidth=args.bandwidth * 1024 * 1024 if args.bandwidth else None,
+                                          throttle_every=args.throttle_every, retry_after=args.retry_after)
+    with stub, tempfile.TemporaryDirectory() as workdir:
+        for scenario in args.scenarios:
+            stub.reset()
+            sp = connect(stub, Path(workdir, scenario), args.rate, args.workers)
+            files, size, seconds = benchmarks[scenario](sp, stub, args, Path(workdir, scenario))
+            sp.log.close()
+            results.append({'scenario': scenario, 'files': files, 'bytes': size, 'seconds': seconds,
+                            'files_per_second': files / seconds if seconds else 0,
+                            'mb_per_second': size / (1024 * 1024) / seconds if seconds else 0,
+                            'requests': stub.requests, 'throttled': stub.throttled})
+    return results
+
+
+def format_results(results):
+    """
+    Format the results as a text table, one line per scenario.
+    """
+    header = ['scenario', 'files', 'MB', 'seconds', 'files/s', 'MB/s', 'requests', 'throttled']
+    rows = [header]
+    for r in results:
+        rows.append([r['scenario'], str(r['files']), f'{r["bytes"] / (1024 * 1024):.2f}', f'{r["seconds"]:.2f}',
+                     f'{r["files_per_second"]:.2f}', f'{r["mb_per_second"]:.2f}', str(r['requests']),
+                     str(r['throttled'])])
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return '\n'.join('  '.join(cell.rjust(widths[i]) for i, cell in enumerate(row)) for row in rows)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the SharePoint driver against a local stand-in.')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds added to every request (0.02)')
+    parser.add_argument('--bandwidth', type=float, default=None,
+                        help='MB/s of every connection of the stand-in (no limit)')
+    parser.add_argument('--throttle-every', type=int, default=0,
+                        help='answer 429 to one request of every N (0, never)')
+    parser.add_argument('--retry-after', type=float, default=1, help='seconds in Retry-After when throttled (1)')
+    parser.add_argument('--rate', type=float, default=RequestScheduler.REQUEST_RATE,
+                        help=f'requests per second of the client ({RequestScheduler.REQUEST_RATE})')
+    parser.add_argument('--workers', type=int, default=office365_api.MAX_WORKERS,
+                        help=f'files or ranges transferred at the same time ({office365_api.MAX_WORKERS})')
+    parser.add_argument('--list-files', type=int, default=2000, help='files of the listing scenario (2000)')
+    parser.add_argument('--list-folders', type=int, default=20, help='folders of the listing scenario (20)')
+    parser.add_argument('--small-files', type=int, default=100, help='files of the small upload (100)')
+    parser.add_argument('--small-size', type=int, default=16 * 1024, help='bytes of every small file (16 KB)')
+    parser.add_argument('--batch-size', type=int, default=office365_api.BATCH_SIZE,
+                        help=f'files in every $batch request of the batched upload ({office365_api.BATCH_SIZE})')
+    parser.add_argument('--large-files', type=int, default=2, help='files of the large upload and download (2)')
+    parser.add_argument('--large-size', type=int, default=32 * 1024 * 1024, help='bytes of every large file (32 MB)')
+    parser.add_argument('--chunk-size', type=int, default=4 * 1024 * 1024,
+                        help='bytes of the chunks of the uploads and of the ranges of the downloads (4 MB)')
+    parser.add_argument('--json', default=None, help='also write the results to this JSON file')
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    results = run(args)
+    print(format_results(results))
+    if args.json:
+        Path(args.json).write_text(json.dumps({'arguments': vars(args), 'results': results}, indent=2))
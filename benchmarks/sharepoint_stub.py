@@ -0,0 +1,588 @@
+# -------------------------------------------------------------------------------
+# Name:        sharepoint_stub
+# Purpose:     Local HTTP server that emulates the SharePoint REST endpoints used by office365_api (form digest, folder
+#              listing, ensure_folder_path, uploads with upload sessions, $batch, downloads, rename, the items and the
+#              change log of the library), keeping the files in memory, with configurable latency, bandwidth and
+#              throttling, to benchmark the driver without a tenant.
+#
+# Author:      Gesuri
+#
+# Created:     October 17, 2026
+# Updated:     October 17, 2026
+#
+# Copyright:   (c) Gesuri 2026
+# -------------------------------------------------------------------------------
+
+import re
+import json
+import uuid
+import datetime
+import threading
+import posixpath
+from time import sleep
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from email import message_from_bytes
+from urllib.parse import urlsplit, unquote, parse_qs, quote
+
+SITE_NAME = 'bench'
+DOC_LIBRARY = 'data'
+PAGE_SIZE = 5000  # items per page of the list items when the client does not ask for $top
+JSON_VERBOSE = 'application/json;odata=verbose;charset=utf-8'  # content type of the JSON answers
+LIST_ID = '8a5a0f4e-8d4b-4c1e-9f7c-2d3e4f5a6b7c'  # id of the list of the document library
+# SP.ChangeType of the changes recorded in the change log
+CHANGE_ADD, CHANGE_UPDATE, CHANGE_DELETE, CHANGE_RENAME = 1, 2, 3, 4
+
+# a segment of a REST path: name, and the arguments between parentheses if there are
+_SEGMENT = re.compile(r"^([^(]+)(?:\((.*)\))?$")
+_ARGUMENT = re.compile(r"(?:(\w+)=)?(guid'[^']*'|'(?:[^']|'')*'|[^,]+)")
+
+
+def _split_path(path):
+    """
+    Split a REST path in segments by '/', without splitting inside the quotes of the arguments.
+    """
+    segments = []
+    current = ''
+    quoted = False
+    for char in path:
+        if char == "'":
+            quoted = not quoted
+        if char == '/' and not quoted:
+            if current:
+                segments.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _arguments(text):
+    """
+    Parse the arguments of a segment, for example "url='a.txt',overwrite=true".
+
+    Returns:
+        tuple: (list of positional arguments, dict of named arguments), the strings without quotes.
+    """
+    args, kwargs = [], {}
+    for name, value in _ARGUMENT.findall(text or ''):
+        value = value.strip()
+        if value.startswith("guid'"):
+            value = value[5:-1]
+        elif value.startswith("'"):
+            value = value[1:-1].replace("''", "'")
+        if name:
+            kwargs[name.lower()] = value
+        else:
+            args.append(value)
+    return args, kwargs
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class SharePointError(Exception):
+    """
+    An error answered to the client as a SharePoint error with an HTTP status.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class SharePointStub:
+    """
+    A local emulation of the SharePoint REST endpoints used by the driver.
+
+    The folders and files are kept in memory, keyed by their server relative URL (/sites/<site>/<library>/...). The
+    server answers in the verbose or in the nometadata JSON format, depending on the Accept header of the request.
+
+    Attributes:
+        site_name (str): Name of the site, the site URL is http://127.0.0.1:<port>/sites/<site_name>.
+        doc_library (str): Name of the document library.
+        latency (float): Seconds added to every request.
+        bandwidth (float): Bytes per second of the bodies of every connection, None for no limit.
+        throttle_every (int): Answer 429 to one request of every throttle_every, 0 to never throttle.
+        retry_after (float): Seconds in the Retry-After header of the throttled requests.
+        requests (int): Number of requests received.
+        throttled (int): Number of requests answered with 429.
+    """
+
+    def __init__(self, site_name=SITE_NAME, doc_library=DOC_LIBRARY, latency=0.0, bandwidth=None, throttle_every=0,
+                 retry_after=1, port=0):
+        self.site_name = site_name
+        self.doc_library = doc_library
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.requests = 0
+        self.throttled = 0
+        self.site_path = f'/sites/{site_name}'
+        self.folders = {self.site_path: _now(), f'{self.site_path}/{doc_library}': _now()}
+        self.files = {}
+        self.sessions = {}
+        self.changes = []
+        self._lock_ = threading.Lock()
+        self._server_ = ThreadingHTTPServer(('127.0.0.1', port), _StubHandler)
+        self._server_.daemon_threads = True
+        self._server_.stub = self
+        self._thread_ = None
+
+    @property
+    def site_url(self):
+        host, port = self._server_.server_address[:2]
+        return f'http://{host}:{port}{self.site_path}'
+
+    def start(self):
+        """
+        Start serving in a background thread.
+
+        Returns:
+            str: The URL of the site.
+        """
+        self._thread_ = threading.Thread(target=self._server_.serve_forever, name='sharepoint_stub', daemon=True)
+        self._thread_.start()
+        return self.site_url
+
+    def stop(self):
+        """
+        Stop the server.
+        """
+        self._server_.shutdown()
+        self._server_.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def reset(self):
+        """
+        Remove all the files and folders of the document library and the counters.
+        """
+        with self._lock_:
+            self.folders = {self.site_path: _now(), f'{self.site_path}/{self.doc_library}': _now()}
+            self.files = {}
+            self.sessions = {}
+            self.changes = []
+            self.requests = 0
+            self.throttled = 0
+
+    def add_file(self, path, content):
+        """
+        Add a file directly, creating its folders, for example to prepare a download benchmark.
+
+        Args:
+            path (str): Path of the file inside the document library.
+            content (bytes): Content of the file.
+        """
+        url = self._resolve_(f'{self.doc_library}/{path}')
+        with self._lock_:
+            self._make_folders_(posixpath.dirname(url))
+            change_type = CHANGE_UPDATE if url in self.files else CHANGE_ADD
+            self.files[url] = {'content': bytes(content), 'created': _now(), 'modified': _now(),
+                               'id': self.files[url]['id'] if url in self.files else str(uuid.uuid4())}
+            self._record_change_(change_type, url)
+
+    def remove_file(self, path):
+        """
+        Remove a file directly, recording its deletion in the change log.
+
+        Args:
+            path (str): Path of the file inside the document library.
+        """
+        url = self._resolve_(f'{self.doc_library}/{path}')
+        with self._lock_:
+            file = self.files.pop(url)
+            self.changes.append({'type': CHANGE_DELETE, 'url': None, 'id': file['id'], 'time': _now()})
+
+    # ---- internal state, must be used with the lock acquired ----
+
+    def _resolve_(self, url):
+        """
+        Get the server relative URL of a path that can be relative to the site.
+        """
+        url = unquote(url).rstrip('/')
+        if not url.startswith('/'):
+            url = f'{self.site_path}/{url}'
+        return posixpath.normpath(url)
+
+    def _record_change_(self, change_type, url):
+        self.changes.append({'type': change_type, 'url': url, 'id': self.files[url]['id'], 'time': _now()})
+
+    def _change_token_(self, number):
+        return f'1;3;{LIST_ID};{number};{number}'
+
+    def _changes_(self, body):
+        """
+        Get the changes after the ChangeTokenStart of the query of a GetChanges request, at most FetchLimit.
+        """
+        query = json.loads(body or b'{}').get('query', {})
+        start = (query.get('ChangeTokenStart') or {}).get('StringValue')
+        first = int(start.rsplit(';', 1)[1]) if start else 0
+        limit = int(query.get('FetchLimit') or 1000)
+        items = []
+        for number, change in enumerate(self.changes[first:first + limit], first + 1):
+            items.append({'ChangeToken': {'StringValue': self._change_token_(number)}, 'ChangeType': change['type'],
+                          'ItemId': int(change['id'][:8], 16), 'ServerRelativeUrl': change['url'] or '',
+                          'Time': change['time'], 'UniqueId': change['id']})
+        return items
+
+    def _make_folders_(self, url):
+        while url.startswith(self.site_path) and url not in self.folders:
+            self.folders[url] = _now()
+            url = posixpath.dirname(url)
+
+    def _children_(self, url):
+        files = sorted(path for path in self.files if posixpath.dirname(path) == url)
+        folders = sorted(path for path in self.folders if posixpath.dirname(path) == url and path != url)
+        return files, folders
+
+    def _file_json_(self, url):
+        file = self.files[url]
+        return {'__metadata': {'type': 'SP.File', 'uri': f"{self.site_url}/_api/web/getFileByServerRelativeUrl('{quote(url)}')"},
+                'Name': posixpath.basename(url), 'ServerRelativeUrl': url, 'Length': str(len(file['content'])),
+                'TimeCreated': file['created'], 'TimeLastModified': file['modified'], 'UniqueId': file['id'],
+                'MajorVersion': 1, 'MinorVersion': 0, 'Exists': True, 'CheckOutType': 2, 'Level': 1}
+
+    def _folder_json_(self, url, expand=()):
+        files, folders = self._children_(url)
+        folder = {'__metadata': {'type': 'SP.Folder', 'uri': f"{self.site_url}/_api/web/getFolderByServerRelativeUrl('{quote(url)}')"},
+                  'Name': posixpath.basename(url), 'ServerRelativeUrl': url, 'Exists': True,
+                  'ItemCount': len(files) + len(folders), 'TimeCreated': self.folders[url],
+                  'TimeLastModified': self.folders[url], 'UniqueId': str(uuid.uuid5(uuid.NAMESPACE_URL, url))}
+        if 'Files' in expand:
+            folder['Files'] = {'results': [self._file_json_(f) for f in files]}
+        if 'Folders' in expand:
+            folder['Folders'] = {'results': [self._folder_json_(f) for f in folders]}
+        return folder
+
+    def _folder_(self, url):
+        if url not in self.folders:
+            raise SharePointError(404, f'File Not Found: {url}')
+        return 'folder', url
+
+    def _file_(self, url):
+        if url not in self.files:
+            raise SharePointError(404, f'File Not Found: {url}')
+        return 'file', url
+
+    def execute(self, method, api_path, query, body):
+        """
+        Run a REST request on the in-memory document library.
+
+        Args:
+            method (str): HTTP method, or the X-HTTP-Method header.
+            api_path (str): Path after /_api/.
+            query (dict): Query options.
+            body (bytes): Body of the request.
+
+        Returns:
+            tuple: (kind, value), kind is 'entity', 'collection', 'items', 'changes', 'value', 'binary' or
+                'none'.
+        """
+        with self._lock_:
+            current = ('web', None)
+            segments = _split_path(api_path)
+            for idx, segment in enumerate(segments):
+                match = _SEGMENT.match(segment)
+                name, args_text = match.group(1).lower(), match.group(2)
+                args, kwargs = _arguments(args_text)
+                kind, url = current
+                if name == 'contextinfo':
+                    return 'context', None
+                elif name == 'web' and kind == 'web':
+                    continue
+                elif name == 'rootfolder' and kind == 'web':
+                    current = self._folder_(self.site_path)
+                elif name in ('getfolderbyserverrelativeurl', 'getfolderbyserverrelativepath'):
+                    current = self._folder_(self._resolve_(kwargs.get('decodedurl', args[0] if args else '')))
+                elif name in ('getfilebyserverrelativeurl', 'getfilebyserverrelativepath'):
+                    current = ('file?', self._resolve_(kwargs.get('decodedurl', args[0] if args else '')))
+                elif name == 'getlist' and kind == 'web':
+                    current = ('list', None)
+                elif name == 'lists' and kind == 'web':
+                    current = ('lists', None)
+                elif name == 'getbytitle' and kind == 'lists':
+                    if (args[0] if args else '') != self.doc_library:
+                        raise SharePointError(404, f"List '{args[0] if args else ''}' does not exist.")
+                    current = ('list', None)
+                elif name == 'items' and kind == 'list':
+                    current = ('items', None)
+                elif name == 'getchanges' and kind == 'list':
+                    return 'changes', self._changes_(body)
+                elif name == 'getfilebyid':
+                    file_id = (args[0] if args else kwargs.get('uniqueid', '')).lower()
+                    urls = [path for path, file in self.files.items() if file['id'] == file_id]
+                    if not urls:
+                        raise SharePointError(404, f'File Not Found: {file_id}')
+                    current = ('file', urls[0])
+                elif name == 'folders' and kind == 'folder':
+                    if args:  # Folders('name')
+                        current = self._folder_(self._resolve_(f'{url}/{args[0]}'))
+                    else:
+                        current = ('folders', url)
+                elif name == 'files' and kind == 'folder':
+                    current = ('files', url)
+                elif name == 'add' and kind == 'folders':
+                    new_url = self._resolve_(args[0] if args[0].startswith('/') else f'{url}/{args[0]}')
+                    self._make_folders_(new_url)
+                    current = ('folder', new_url)
+                elif name == 'add' and kind == 'files':
+                    new_url = self._resolve_(f"{url}/{kwargs.get('url', args[0] if args else '')}")
+                    if new_url in self.files and kwargs.get('overwrite', 'false').lower() != 'true':
+                        raise SharePointError(400, f'A file with the name {new_url} already exists.')
+                    previous = self.files.get(new_url)
+                    self.files[new_url] = {'content': body, 'created': previous['created'] if previous else _now(),
+                                           'modified': _now(), 'id': previous['id'] if previous else str(uuid.uuid4())}
+                    self._record_change_(CHANGE_UPDATE if previous else CHANGE_ADD, new_url)
+                    current = ('file', new_url)
+                elif kind == 'file?':
+                    current = self._file_(url)
+                    return self.execute_file(current[1], segments[idx:], query, body)
+                elif kind == 'file':
+                    return self.execute_file(url, segments[idx:], query, body)
+                else:
+                    raise SharePointError(404, f'Resource not found for the segment {segment}.')
+            kind, url = current
+            if kind == 'file?':
+                kind, url = self._file_(url)
+            if kind == 'file':
+                return 'entity', self._file_json_(url)
+            if kind == 'folder':
+                expand = [e.strip() for e in query.get('$expand', [''])[0].split(',') if e.strip()]
+                return 'entity', self._folder_json_(url, expand)
+            if kind == 'files':
+                return 'collection', [self._file_json_(f) for f in self._children_(url)[0]]
+            if kind == 'folders':
+                return 'collection', [self._folder_json_(f) for f in self._children_(url)[1]]
+            if kind == 'items':
+                # the document library is the only list, with an item per file
+                return 'items', [{'__metadata': {'type': 'SP.Data.DocumentsItem'}, 'Id': n, 'ID': n,
+                                  'FileLeafRef': posixpath.basename(path), 'FileRef': path,
+                                  'Modified': file['modified'], 'GUID': file['id']}
+                                 for n, (path, file) in enumerate(sorted(self.files.items()), 1)]
+            if kind == 'list':
+                return 'entity', {'__metadata': {'type': 'SP.List'}, 'Id': LIST_ID,
+                                  'CurrentChangeToken': {'StringValue': self._change_token_(len(self.changes))}}
+            return 'entity', {'__metadata': {'type': 'SP.Web'}, 'ServerRelativeUrl': self.site_path}
+
+    def execute_file(self, url, segments, query, body):
+        """
+        Run the operations on a file. Must be called with the lock acquired.
+        """
+        if not segments:
+            return 'entity', self._file_json_(url)
+        match = _SEGMENT.match(segments[0])
+        name, (args, kwargs) = match.group(1).lower(), _arguments(match.group(2))
+        file = self.files[url]
+        if name in ('$value', 'openbinarystream'):
+            return 'binary', file['content']
+        if name == 'startupload':
+            self.sessions[kwargs['uploadid'].lower()] = bytearray(body)
+            return 'value', ('StartUpload', str(len(body)))
+        if name == 'continueupload':
+            data = self.sessions.get(kwargs['uploadid'].lower())
+            if data is None or int(kwargs['fileoffset']) != len(data):
+                raise SharePointError(400, 'The upload session was not found or the offset is not valid.')
+            data.extend(body)
+            return 'value', ('ContinueUpload', str(len(data)))
+        if name == 'finishupload':
+            data = self.sessions.pop(kwargs['uploadid'].lower(), bytearray())
+            if int(kwargs['fileoffset']) != len(data):
+                raise SharePointError(400, 'The offset is not valid.')
+            data.extend(body)
+            file['content'] = bytes(data)
+            file['modified'] = _now()
+            self._record_change_(CHANGE_UPDATE, url)
+            return 'entity', self._file_json_(url)
+        if name in ('moveto', 'moveto2', 'movetousingpath'):
+            new_url = self._resolve_(kwargs.get('newurl', kwargs.get('decodedurl', args[0] if args else '')))
+            self.files[new_url] = self.files.pop(url)
+            self._record_change_(CHANGE_RENAME, new_url)
+            return 'none', None
+        if name == 'listitemallfields':
+            # File.rename updates the FileLeafRef field of the list item of the file
+            fields = json.loads(body or b'{}')
+            if 'FileLeafRef' in fields:
+                new_url = posixpath.join(posixpath.dirname(url), fields['FileLeafRef'])
+                self.files[new_url] = self.files.pop(url)
+                self._record_change_(CHANGE_RENAME, new_url)
+                return 'none', None
+            return 'entity', {'__metadata': {'type': 'SP.ListItem'}, 'FileLeafRef': posixpath.basename(url)}
+        raise SharePointError(404, f'Resource not found for the segment {segments[0]}.')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    The HTTP handler of SharePointStub. The answers are built as (status, body, content type, headers) tuples, so the
+    requests of a $batch are answered like the others.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _limit_(self, size):
+        """
+        Wait the time that size bytes take with the bandwidth of the stub.
+        """
+        bandwidth = self.server.stub.bandwidth
+        if bandwidth and size:
+            sleep(size / bandwidth)
+
+    def _send_(self, status, body=b'', content_type=JSON_VERBOSE, headers=None):
+        self._limit_(len(body))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def _json_(obj, status=200, headers=None):
+        return status, json.dumps(obj).encode(), JSON_VERBOSE, headers
+
+    def _handle_(self):
+        stub = self.server.stub
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        self._limit_(len(body))
+        if stub.latency:
+            sleep(stub.latency)
+        with stub._lock_:
+            stub.requests += 1
+            throttle = stub.throttle_every and stub.requests % stub.throttle_every == 0
+            if throttle:
+                stub.throttled += 1
+        if throttle:
+            return self._send_(*self._json_({'error': {'code': '-2147024860',
+                                                       'message': {'value': 'Too many requests.'}}},
+                                            429, {'Retry-After': str(stub.retry_after)}))
+        if unquote(urlsplit(self.path).path) == f'{stub.site_path}/_api/$batch':
+            return self._send_(*self._batch_(self.headers.get('Content-Type') or '', body))
+        return self._send_(*self._answer_(self.command, self.path, self.headers, body))
+
+    def _answer_(self, command, target, headers, body):
+        """
+        Answer one request, sent on its own or inside a $batch.
+        """
+        stub = self.server.stub
+        parts = urlsplit(target)
+        path = unquote(parts.path)
+        if not path.startswith(f'{stub.site_path}/_api/'):
+            return self._json_({'error': {'code': '-1', 'message': {'value': 'Not found.'}}}, 404)
+        method = headers.get('X-HTTP-Method', command)
+        nometadata = 'nometadata' in (headers.get('Accept') or '')
+        query = parse_qs(parts.query)
+        try:
+            kind, value = stub.execute(method, path[len(f'{stub.site_path}/_api/'):], query, body)
+        except SharePointError as e:
+            return self._json_({'error': {'code': '-1', 'message': {'lang': 'en-US', 'value': str(e)}}}, e.status)
+        if kind == 'context':
+            return self._json_({'d': {'GetContextWebInformation': {
+                '__metadata': {'type': 'SP.ContextWebInformation'}, 'FormDigestValue': 'digest',
+                'FormDigestTimeoutSeconds': 1800, 'WebFullUrl': stub.site_url, 'SiteFullUrl': stub.site_url}}})
+        if kind == 'binary':
+            return self._binary_(value, headers.get('Range'))
+        if kind == 'none':
+            return 200, b'', JSON_VERBOSE, None
+        if kind == 'value':
+            function, result = value
+            return self._json_({'value': result} if nometadata else {'d': {function: result}})
+        if kind in ('collection', 'items'):
+            # as SharePoint, only the list items are paged, $top on other collections just truncates them
+            return self._collection_(value, query, nometadata, parts, paged=kind == 'items')
+        if kind == 'changes':
+            return self._json_({'value': value} if nometadata else {'d': {'results': value}})
+        if nometadata:
+            return self._json_({k: v for k, v in value.items() if k != '__metadata'})
+        return self._json_({'d': value})
+
+    def _batch_(self, content_type, body):
+        """
+        Answer a $batch request: every application/http part is answered in order, and the parts of a change set are
+        answered inside a change set response, as SharePoint does.
+        """
+        message = message_from_bytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + body)
+        boundary = f'batchresponse_{uuid.uuid4()}'
+        out = []
+        for part in message.get_payload():
+            if part.is_multipart():
+                changeset = f'changesetresponse_{uuid.uuid4()}'
+                out.append(f'--{boundary}\r\nContent-Type: multipart/mixed; boundary={changeset}\r\n\r\n'.encode())
+                for request in part.get_payload():
+                    out.append(f'--{changeset}\r\n'.encode() + self._batch_answer_(request))
+                out.append(f'--{changeset}--\r\n'.encode())
+            else:
+                out.append(f'--{boundary}\r\n'.encode() + self._batch_answer_(part))
+        out.append(f'--{boundary}--\r\n'.encode())
+        return 200, b''.join(out), f'multipart/mixed; boundary={boundary}', None
+
+    def _batch_answer_(self, part):
+        """
+        Answer the request of an application/http part of a $batch, as an application/http part.
+        """
+        request = part.get_payload(decode=True)
+        head, _, body = request.lstrip().partition(b'\r\n\r\n')
+        lines = head.decode().split('\r\n')
+        command, target = lines[0].split()[:2]
+        headers = {}
+        for line in lines[1:]:
+            key, _, value = line.partition(':')
+            headers[key.strip().title()] = value.strip()
+        if 'Content-Length' in headers:
+            body = body[:int(headers['Content-Length'])]
+        status, content, content_type, extra = self._answer_(command, target, headers, body)
+        head = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}', f'CONTENT-TYPE: {content_type}']
+        head += [f'{key}: {value}' for key, value in (extra or {}).items()]
+        return (b'Content-Type: application/http\r\nContent-Transfer-Encoding: binary\r\n\r\n' +
+                '\r\n'.join(head).encode() + b'\r\n\r\n' + content + b'\r\n')
+
+    @staticmethod
+    def _binary_(content, range_header):
+        match = re.match(r'bytes=(\d+)-(\d*)', range_header or '')
+        if match is None:
+            return 200, content, 'application/octet-stream', None
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else len(content) - 1
+        end = min(end, len(content) - 1)
+        return (206, content[start:end + 1], 'application/octet-stream',
+                {'Content-Range': f'bytes {start}-{end}/{len(content)}'})
+
+    def _collection_(self, items, query, nometadata, parts, paged):
+        top = int(query.get('$top', [PAGE_SIZE if paged else len(items)])[0])
+        skip = int(query.get('$skiptoken', ['0'])[0])
+        select = [s.strip() for s in query.get('$select', [''])[0].split(',') if s.strip()]
+        if '$orderby' in query:
+            field, _, direction = query['$orderby'][0].strip().partition(' ')
+            items = sorted(items, key=lambda item: item.get(field) or '', reverse=direction.strip().lower() == 'desc')
+        page = items[skip:skip + top]
+        if select:
+            page = [{k: v for k, v in item.items() if k in select or k == '__metadata'} for item in page]
+        next_link = None
+        if paged and skip + top < len(items):
+            params = {k: v[0] for k, v in query.items()}
+            params['$skiptoken'] = str(skip + top)
+            next_link = (f'{self.server.stub.site_url.rsplit(self.server.stub.site_path, 1)[0]}{parts.path}?'
+                         + '&'.join(f'{k}={quote(v)}' for k, v in params.items()))
+        if nometadata:
+            payload = {'value': [{k: v for k, v in item.items() if k != '__metadata'} for item in page]}
+            if next_link:
+                payload['odata.nextLink'] = next_link
+            return self._json_(payload)
+        payload = {'d': {'results': page}}
+        if next_link:
+            payload['d']['__next'] = next_link
+        return self._json_(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_MERGE = _handle_
@@ -5,44 +5,56 @@ from pathlib import PurePath
 
 ##
 
+# mirror command: python download.py mirror <SharePoint folder> <local folder> [file name pattern]
+# replicates the SharePoint folder with all its subfolders, only downloading the files that changed
+MIRROR = len(sys.argv) > 1 and sys.argv[1] == 'mirror'
+if MIRROR:
+    sys.argv.pop(1)
 # 1 args = SharePoint folder name. May include subfolders YouTube/2022
 FOLDER_NAME = sys.argv[1]
 # 2 args = locate or remote folder_dest
 FOLDER_DEST = sys.argv[2]
 # 3 args = SharePoint file name. This is used when only one file is being downloaded
 # if all files will be download, thenn set this values as "None"
-FILE_NAME = sys.argv[3]
-# 4 args = SharePoint file name pattern
+FILE_NAME = sys.argv[3] if not MIRROR else 'None'
+# 4 args = SharePoint file name pattern (3 args in the mirror command)
 # if no pattern match files are required to download, thenn set this values as "None"
-FILE_NAME_PATTERN = sys.argv[4]
-
-
-def save_file(file_n, file_obj):
-    file_dir_path = PurePath(FOLDER_DEST, file_n)
-    with open(file_dir_path, 'wb') as f:
-        f.write(file_obj)
+FILE_NAME_PATTERN = sys.argv[4] if not MIRROR else (sys.argv[3] if len(sys.argv) > 3 else 'None')
 
 
 def get_file(file_n, folder):
-    file_obj = SharePoint().download_file(file_n, folder)
-    save_file(file_n, file_obj)
+    # the file is written to disk in blocks while it is downloaded
+    SharePoint.shared().download_file_to(file_n, folder, PurePath(FOLDER_DEST, file_n))
 
 
 def get_files(folder):
-    files_list = (SharePoint().get_files_list(folder))
+    files_list = (SharePoint.shared().get_files_list(folder))
     for file in files_list:
         get_file(file.name, folder)
 
 
 def get_files_by_pattern(keyword, folder):
-    files_list = SharePoint().get_files_list(folder)
+    files_list = SharePoint.shared().get_files_list(folder)
     for file in files_list:
         if re.match(keyword, file.name):
             get_file(file.name, folder)
 
 
+def mirror(folder, keyword=None):
+    results, summary = SharePoint.shared().mirror(folder, FOLDER_DEST, pattern=keyword)
+    for result in results:
+        if not result['success']:
+            print(f'File not downloaded: {result["remote_file_url"]}')
+    for folder in summary['failed_folders']:
+        print(f'Folder not listed: {folder}')
+    return summary['failed']
+
+
 if __name__ == '__main__':
-    if FILE_NAME != 'None':
+    if MIRROR:
+        if mirror(FOLDER_NAME, None if FILE_NAME_PATTERN == 'None' else FILE_NAME_PATTERN):
+            sys.exit(1)
+    elif FILE_NAME != 'None':
         get_file(FILE_NAME, FOLDER_NAME)
     elif FILE_NAME_PATTERN != 'None':
         get_files_by_pattern(FILE_NAME_PATTERN, FOLDER_NAME)
@@ -110,8 +110,8 @@ in chunks.
 
 ### 2. **Progress Tracking**
 
-The script uses `tqdm` for progress tracking when downloading large files. A progress bar will be displayed to show the 
-upload/download progress.
+The script uses `tqdm` for progress tracking of the large uploads and downloads. The transfers running at the same time
+are shown in one progress bar (see Progress.py), redrawn at most twice a second. Use progress=False for headless runs.
 
 ### 3. **Authentication**
 
@@ -152,26 +152,143 @@ sharepoint_doc_library=data
 '''
 
 import os
+import re
+import posixpath
 import environ
 from office365.sharepoint.client_context import ClientContext
 from office365.runtime.auth.user_credential import UserCredential
 from office365.runtime.auth.client_credential import ClientCredential
+from office365.runtime.auth.providers.acs_token_provider import ACSTokenProvider
+from office365.runtime.auth.token_response import TokenResponse
 from office365.sharepoint.files.file import File
+from office365.runtime.http.request_options import RequestOptions
+from office365.runtime.http.http_method import HttpMethod
 # from office365.runtime.client_request_exception import ClientRequestException
 import datetime
-from time import sleep
-from tqdm import tqdm
-import sys
+import asyncio
+import functools
+import itertools
+import copy
+import contextlib
+import uuid
+import hashlib
+import zipfile
+import tempfile
+import threading
+from email import message_from_bytes
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from time import sleep, time, perf_counter
 from pathlib import Path
+from urllib.parse import quote
 import Log
 import ElapsedTime
+import MetadataCache
+import UploadSessions
+import TokenCache
+import RequestScheduler
+import TransferMetrics
+import Progress
+import SyncManifest
+import Bundles
+import ChangeTokens
 
 
 CHUNK_SIZE = 20 * 1000000  # 20Mb
+MIN_CHUNK_SIZE = 1 * 1000000  # 1Mb, smallest chunk size of the adaptive uploads
+MAX_CHUNK_SIZE = 200 * 1000000  # 200Mb, largest chunk size of the adaptive uploads
+CHUNK_TARGET_TIME = 5  # seconds that each chunk should take in the adaptive uploads
+MAX_WORKERS = 4  # default number of concurrent transfers
+ASYNC_CONCURRENCY = 16  # default number of operations running at the same time in AsyncSharePoint
+RANGE_RETRIES = 5  # retries of each byte range in parallel downloads
+BLOCK_SIZE = 1024 * 1024  # 1MB, size of the blocks written to disk when streaming a download
+BATCH_SIZE = 100  # maximum number of requests in a $batch request of SharePoint
+PAGE_SIZE = 5000  # list items requested per page, the list view threshold of SharePoint
+CHANGES_FETCH_LIMIT = 1000  # changes requested at a time to the change log
+# types of the changes of the items (SP.ChangeType) returned by get_changes
+CHANGE_TYPES = {1: 'add', 2: 'update', 3: 'delete', 4: 'rename', 5: 'move_away', 6: 'move_into', 7: 'restore'}
+FILE_FIELDS = ['UniqueId', 'Name', 'MajorVersion', 'MinorVersion', 'Length', 'TimeCreated', 'TimeLastModified',
+               'ServerRelativeUrl']
 
 env = environ.Env()
 environ.Env.read_env()
 
+# SharePoint objects shared by SharePoint.shared(), keyed by site, document library and credentials
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def _session_rejected(error):
+    """
+    Checks if an error of a chunk of an upload session is SharePoint rejecting the session, its upload id or its offset
+    (a 4xx answer other than the authentication and throttling ones), so the session can not be resumed. Network
+    errors and errors of the server keep the session.
+
+    :param error: Error raised by the request of the chunk.
+    """
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status is not None and 400 <= status < 500 and status not in (401, 403, 429)
+
+
+def _batch_statuses(response):
+    """
+    Returns the HTTP status of every request of the response of a $batch request, in the order of the requests.
+
+    :param response: Response of the $batch request, a multipart/mixed message with an application/http part for every
+        request, inside the parts of their change sets.
+    """
+    message = message_from_bytes(b'Content-Type: ' + response.headers['Content-Type'].encode('ascii') + b'\r\n\r\n' +
+                                 response.content)
+    statuses = []
+    for part in message.walk():
+        if part.get_content_type() == 'application/http':
+            status_line = part.get_payload(decode=True).lstrip().split(b'\r\n', 1)[0]
+            statuses.append(int(status_line.split()[1]))
+    return statuses
+
+
+def next_chunk_size(chunk_size, elapsed, min_chunk_size=MIN_CHUNK_SIZE, max_chunk_size=MAX_CHUNK_SIZE,
+                    target_time=CHUNK_TARGET_TIME):
+    """
+    Returns the size of the next chunk of an adaptive upload from the time the last chunk took.
+
+    The size is the one that would take target_time at the throughput measured with the last chunk, so fast links send
+    large chunks (fewer round-trips) and slow links send small chunks (less data lost if a chunk fails). The size can at
+    most double or halve from one chunk to the next, to not overreact to one slow or fast request.
+
+    :param chunk_size: Size in bytes of the last chunk.
+    :param elapsed: Seconds the last chunk took, including the latency of the request.
+    :param min_chunk_size: Smallest chunk size (default: MIN_CHUNK_SIZE).
+    :param max_chunk_size: Largest chunk size (default: MAX_CHUNK_SIZE).
+    :param target_time: Seconds each chunk should take (default: CHUNK_TARGET_TIME).
+    :return: Size in bytes of the next chunk.
+    """
+    if elapsed <= 0:
+        new_size = chunk_size * 2
+    else:
+        new_size = int(chunk_size / elapsed * target_time)
+    new_size = min(max(new_size, chunk_size // 2), chunk_size * 2)
+    return min(max(new_size, min_chunk_size), max_chunk_size)
+
+
+def _timestamp(value):
+    """
+    Converts a time of SharePoint, an ISO string in UTC as '2024-08-14T10:00:00Z' or a datetime, to seconds since the
+    epoch.
+
+    :param value: The time.
+    :return: The seconds since the epoch, or None if the time is not valid.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime.datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value.timestamp()
+
 
 class SharePoint:
     """
@@ -183,15 +300,25 @@ class SharePoint:
 
     Attributes:
         ctx: ClientContext object for handling the SharePoint connection.
-        pbar: Progress bar instance for file download and upload tracking.
         log: Log object for capturing events and errors.
-        __total_size_: Internal tracking for file size during uploads.
+        cache: MetadataCache with the folders already listed, shared with the clones of this instance.
+        upload_sessions: UploadSessions with the state of the chunked uploads in progress, on disk or only in memory.
+        token_cache: TokenCache where the access tokens are kept between runs, or None to not keep them.
+        scheduler: RequestScheduler that all the requests go through, by default the one shared by the process.
+        metrics: TransferMetrics where an event is recorded for every transfer, or None to not record them.
+        progress: Progress where the transfers report their bytes, shared with the clones of this instance so the
+            concurrent transfers are shown in one progress bar.
+        timings: ElapsedTime.Timings where the time of the operations and of their steps is recorded, or None to not
+            record it.
+        pbar: Progress.Transfer of the large download or upload in progress, or None. Kept for the code written for the
+            old progress bar, see bar_download_progress and bar_upload_progress.
     """
     pbar = None
-    __total_size_ = 0
 
     def __init__(self, username=None, password=None, client_id=None, client_secret=None, sharepoint_site=None,
-                 sharepoint_site_name=None, sharepoint_doc=None, log=None):
+                 sharepoint_site_name=None, sharepoint_doc=None, log=None, cache_ttl=MetadataCache.CACHE_TTL,
+                 cache_size=MetadataCache.CACHE_SIZE, upload_sessions=None, token_cache=None, scheduler=None,
+                 metrics=None, progress=None, timings=None, manifest=None):
         """
         Initializes the SharePoint class and authenticates using either user or client credentials.
 
@@ -203,6 +330,28 @@ class SharePoint:
         :param sharepoint_site_name: SharePoint site name.
         :param sharepoint_doc: SharePoint document library name.
         :param log: Log object to handle logging, defaults to internal Log class.
+        :param cache_ttl: Seconds a folder listing is kept in memory, 0 to disable the cache (default: 60).
+        :param cache_size: Maximum number of folder listings kept in memory (default: 256).
+        :param upload_sessions: Path of the file where the state of the chunked uploads is kept to resume them, or an
+            UploadSessions object (default: the sharepoint_upload_sessions environment variable, if it is not set the
+            state is kept in memory, so the retries of an upload resume it, but not a new run).
+        :param token_cache: Path of the file where the access token of the client credentials is kept until it expires,
+            or a TokenCache object (default: the sharepoint_token_cache environment variable, if it is not set the
+            token is not kept).
+        :param scheduler: RequestScheduler that limits the rate and concurrency of the requests and retries the
+            throttled ones (default: the scheduler shared by the whole process).
+        :param metrics: Path of the JSON lines file where an event (operation, path, bytes, duration, retries and
+            outcome) is written for every transfer, or a TransferMetrics object (default: the sharepoint_metrics
+            environment variable, if it is not set no events are written).
+        :param progress: Progress object where the transfers report their bytes, or False to not draw any progress
+            bar, for headless runs (default: a new Progress, drawn unless the sharepoint_progress environment variable
+            is false).
+        :param timings: ElapsedTime.Timings where the time spent in every operation and in its steps (auth,
+            ensure_folder, upload_session, chunk, verify, request...) is recorded as nested spans, or True to create one
+            (default: None, nothing is recorded).
+        :param manifest: Path of the SyncManifest file where the content hash of the files uploaded with
+            skip_unchanged is recorded, or a SyncManifest object (default: the sharepoint_manifest environment variable,
+            if it is not set the files are never skipped).
         """
         self.ctx = None
         if username is None:
@@ -234,13 +383,81 @@ class SharePoint:
         else:
             self.__sharepoint_doc_ = sharepoint_doc
         if log is not None and isinstance(log, str):
-            self.log = Log.Log(log)
+            self.log = Log.Log(log, buffered=True)
         elif isinstance(log, Log.Log):
             self.log = log
         else:
             self.log = Log.Log(fprint=False, sprint=True)
+        self.cache = MetadataCache.MetadataCache(ttl=cache_ttl, max_size=cache_size)
+        # folders of the document library known to exist in this session, shared with the clones
+        self.known_folders = set()
+        self._known_folders_lock_ = threading.Lock()
+        if upload_sessions is None:
+            upload_sessions = env('sharepoint_upload_sessions', default=None)
+        if upload_sessions is None:
+            upload_sessions = UploadSessions.UPLOAD_SESSIONS_MEMORY
+        if isinstance(upload_sessions, UploadSessions.UploadSessions):
+            self.upload_sessions = upload_sessions
+        else:
+            self.upload_sessions = UploadSessions.UploadSessions(upload_sessions)
+        if token_cache is None:
+            token_cache = env('sharepoint_token_cache', default=None)
+        if token_cache is None or isinstance(token_cache, TokenCache.TokenCache):
+            self.token_cache = token_cache
+        else:
+            self.token_cache = TokenCache.TokenCache(token_cache)
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler.default_scheduler()
+        if metrics is None:
+            metrics = env('sharepoint_metrics', default=None)
+        if metrics is None or isinstance(metrics, TransferMetrics.TransferMetrics):
+            self.metrics = metrics
+        else:
+            self.metrics = TransferMetrics.TransferMetrics(metrics)
+        if isinstance(progress, Progress.Progress):
+            self.progress = progress
+        else:
+            if progress is None:
+                progress = env.bool('sharepoint_progress', default=True)
+            self.progress = Progress.Progress(enabled=bool(progress))
+        self.timings = ElapsedTime.Timings() if timings is True else timings or None
+        if manifest is None:
+            manifest = env('sharepoint_manifest', default=None)
+        if manifest is None or isinstance(manifest, SyncManifest.SyncManifest):
+            self.manifest = manifest
+        else:
+            self.manifest = SyncManifest.SyncManifest(manifest)
         self.getConnection()
 
+    @classmethod
+    def shared(cls, username=None, password=None, client_id=None, client_secret=None, sharepoint_site=None,
+               sharepoint_site_name=None, sharepoint_doc=None, **kwargs):
+        """
+        Returns the SharePoint object of the process for a site, document library and credentials, creating it the
+        first time, so all the operations of a script share one authentication.
+
+        The parameters are the same as the constructor; the ones not given are read from the environment. The shared
+        object must not be used from several threads at the same time, use clone() for that.
+
+        :return: The shared SharePoint object.
+        """
+        def _value(value, name):
+            # the same default as the constructor
+            return env(name) if value is None else value
+
+        # the secrets are part of the key, hashed, so other credentials for the same site get their own session
+        secrets = f"{_value(password, 'sharepoint_password')}\0{_value(client_secret, 'sharepoint_client_secret')}"
+        key = (_value(sharepoint_site, 'sharepoint_url_site'), _value(sharepoint_site_name, 'sharepoint_site_name'),
+               _value(sharepoint_doc, 'sharepoint_doc_library'), _value(username, 'sharepoint_email'),
+               _value(client_id, 'sharepoint_client_id'), hashlib.sha256(secrets.encode()).hexdigest())
+        with _sessions_lock:
+            sp = _sessions.get(key)
+            if sp is None or sp.ctx is None:
+                sp = cls(username=username, password=password, client_id=client_id, client_secret=client_secret,
+                         sharepoint_site=sharepoint_site, sharepoint_site_name=sharepoint_site_name,
+                         sharepoint_doc=sharepoint_doc, **kwargs)
+                _sessions[key] = sp
+            return sp
+
     def getConnection(self, renew=False):
         """
         Authenticates with SharePoint and initializes the connection context.
@@ -256,15 +473,33 @@ class SharePoint:
         if self.__client_id_ is not None and len(self.__client_id_) > 0 and self.__client_secret_ is not None and len(
                 self.__client_secret_) > 0:
             self.log.live('Authenticating with client...')
-            self._auth_with_client()
+            with self._span('auth'):
+                self._auth_with_client()
         elif self.__username_ is not None and len(self.__username_) > 0 and self.__password_ is not None and len(
                 self.__password_) > 0:
             self.log.live('Authenticating with user...')
-            self._auth_with_user()
+            with self._span('auth'):
+                self._auth_with_user()
         else:
             self.log.error('No credentials provided.')
             self.ctx = None
 
+    def clone(self):
+        """
+        Returns a copy of this instance with its own ClientContext that reuses the same authentication.
+
+        The ClientContext keeps a queue of pending queries, so it can not be shared between threads. The clone gets a
+        fresh context for the same site that shares the authentication of this one, so no new login is done.
+
+        :return: A new SharePoint object ready to be used from another thread.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        sp = copy.copy(self)
+        if self.ctx is not None:
+            sp.ctx = self.ctx.clone(self.__sharepoint_site_)
+        return sp
+
     def print_all_vars(self):
         """
         Prints all internal variables (credentials, site information) for debugging.
@@ -294,14 +529,145 @@ class SharePoint:
         Authenticates with SharePoint using client ID and secret credentials.
         """
         try:
-            client_credentials = ClientCredential(self.__client_id_, self.__client_secret_)
-            self.ctx = ClientContext(self.__sharepoint_site_).with_credentials(client_credentials)
+            if self.token_cache is not None:
+                self.ctx = ClientContext(self.__sharepoint_site_).with_access_token(self._client_token)
+            else:
+                client_credentials = ClientCredential(self.__client_id_, self.__client_secret_)
+                self.ctx = ClientContext(self.__sharepoint_site_).with_credentials(client_credentials)
         except Exception as e:
             self.log.error(f'Not possible to authenticate.')
             self.log.error(f'Error: {e}')
             return None
         return self.ctx
 
+    def _client_token(self):
+        """
+        Returns the access token of the client credentials, from the token cache if it is still valid, otherwise a new
+        one is requested and saved in the cache. It is called by the ClientContext when the token is needed.
+
+        :return: TokenResponse with the access token and the seconds it is still valid.
+        """
+        key = f'{self.__client_id_}@{self.__sharepoint_site_}'
+        token = self.token_cache.get(key)
+        if token is None:
+            self.log.live('Requesting a new access token...')
+            provider = ACSTokenProvider(self.__sharepoint_site_,
+                                        ClientCredential(self.__client_id_, self.__client_secret_))
+            with self._span('auth'):
+                response = provider.get_app_only_access_token()
+            expires_on = getattr(response, 'expiresOn', None) or time() + int(getattr(response, 'expiresIn', 3600))
+            token = {'access_token': response.accessToken, 'token_type': response.tokenType,
+                     'expires_on': float(expires_on)}
+            self.token_cache.put(key, token['access_token'], token['token_type'], token['expires_on'])
+        # the context asks for the token again when it expires, before the cache stops returning it
+        expires_in = int(token['expires_on'] - self.token_cache.margin - time())
+        return TokenResponse.from_json({'access_token': token['access_token'], 'token_type': token['token_type'],
+                                        'expires_in': expires_in})
+
+    def _execute(self, func):
+        """
+        Runs a function that sends requests to SharePoint through the request scheduler, so it respects the rate and
+        concurrency limits and is retried when SharePoint throttles it.
+
+        The function must add its own queries to the context, because the queries left by a failed attempt are removed
+        before it is retried. If SharePoint rejects the cached access token (401), the token is removed from the token
+        cache and the function is tried once more with a new one.
+
+        :param func: Function without arguments that sends the requests.
+        :return: The value returned by the function.
+        """
+        def _drop_queries():
+            # clear() also replaces the pending request, the new one keeps the authentication and the transport of the
+            # old one, only the form digest is requested again
+            if self.ctx is not None:
+                request = self.ctx.pending_request()
+                self.ctx.clear().pending_request().reuse(request)
+
+        def _attempt():
+            try:
+                return func()
+            except Exception as e:
+                _drop_queries()
+                if not self._token_rejected(e):
+                    raise
+            try:
+                return func()
+            except Exception:
+                _drop_queries()
+                raise
+
+        with self._span('request'):
+            return self.scheduler.run(_attempt, log=self.log)
+
+    def _token_rejected(self, error):
+        """
+        Checks if an error is SharePoint rejecting the access token kept in the token cache (401), for example because
+        it was revoked before it expired. If so, the token is removed from the cache and from the context, so the next
+        request authenticates again.
+
+        :param error: Error raised by a request.
+        :return: True if the token was dropped and the request can be tried again.
+        """
+        response = getattr(error, 'response', None)
+        if self.token_cache is None or self.ctx is None or getattr(response, 'status_code', None) != 401:
+            return False
+        self.log.warn('SharePoint rejected the cached access token, requesting a new one...')
+        self.token_cache.remove(f'{self.__client_id_}@{self.__sharepoint_site_}')
+        # the authentication context is shared with the clones, all of them request the new token
+        self.ctx.authentication_context._cached_token = None
+        return True
+
+    def _span(self, name):
+        """
+        Returns a context manager that records the time spent inside it in timings, as a span nested in the one already
+        open in the thread. It does nothing if timings is None.
+
+        :param name: Name of the span.
+        """
+        if self.timings is None:
+            return contextlib.nullcontext()
+        return self.timings.span(name)
+
+    def _send_request(self, request):
+        """
+        Sends a raw REST request through the request scheduler.
+
+        :param request: RequestOptions of the request.
+        :return: The response, an error is raised if its status is not successful.
+        """
+        def _send():
+            response = self.ctx.pending_request().execute_request_direct(request)
+            response.raise_for_status()
+            return response
+
+        return self._execute(_send)
+
+    @contextlib.contextmanager
+    def _measure(self, operation, path):
+        """
+        Records in metrics the event of an operation: the time it takes, the retries done meanwhile by the thread and
+        its outcome. The operation is also a span of timings. The caller sets 'bytes', and 'outcome' when the operation
+        fails without raising an error, in the yielded dictionary.
+
+        :param operation: Type of operation, for example 'upload' or 'download'.
+        :param path: Path of the file or folder inside the document library.
+        """
+        event = {'bytes': 0, 'retries': 0, 'outcome': TransferMetrics.OUTCOME_OK}
+        with self._span(operation):
+            if self.metrics is None:
+                yield event
+                return
+            retries = self.scheduler.retries()
+            started = perf_counter()
+            try:
+                yield event
+            except BaseException:
+                event['outcome'] = TransferMetrics.OUTCOME_FAILED
+                raise
+            finally:
+                self.metrics.record(operation, path, event['bytes'], perf_counter() - started,
+                                    event['retries'] + self.scheduler.retries() - retries, event['outcome'])
+
     def get_files_list(self, folder_name=None):
         """
         Retrieves the list of files from the specified folder in the document library.
@@ -313,14 +679,19 @@ class SharePoint:
             self.getConnection()
         if folder_name is None:
             folder_name = ''
+        cached = self.cache.get(self._folder_key(folder_name))
+        if cached is not None and 'files' in cached:
+            return cached['files']
         target_folder_url = f'{self.__sharepoint_doc_}/{folder_name}'
         try:
-            root_folder = self.ctx.web.get_folder_by_server_relative_url(target_folder_url)
-            root_folder.expand(["Files", "Folders"]).get().execute_query()
+            with self._measure('list', folder_name):
+                root_folder = self.ctx.web.get_folder_by_server_relative_url(target_folder_url)
+                self._execute(lambda: root_folder.expand(["Files", "Folders"]).get().execute_query())
         except Exception as e:
             self.log.error(f'Not possible to get files list.')
             self.log.error(f'Error: {e}')
             return None
+        self.cache.put(self._folder_key(folder_name), {'files': root_folder.files, 'folders': root_folder.folders})
         return root_folder.files
 
     def get_folder_list(self, folder_name=None):
@@ -334,16 +705,171 @@ class SharePoint:
             self.getConnection()
         if folder_name is None:
             folder_name = ''
+        cached = self.cache.get(self._folder_key(folder_name))
+        if cached is not None and 'folders' in cached:
+            return cached['folders']
         target_folder_url = f'{self.__sharepoint_doc_}/{folder_name}'
         try:
-            root_folder = self.ctx.web.get_folder_by_server_relative_url(target_folder_url)
-            root_folder.expand(["Folders"]).get().execute_query()
+            with self._measure('list', folder_name):
+                root_folder = self.ctx.web.get_folder_by_server_relative_url(target_folder_url)
+                self._execute(lambda: root_folder.expand(["Folders"]).get().execute_query())
         except Exception as e:
             self.log.error(f'Not possible to get folder list.')
             self.log.error(f'Error: {e}')
             return None
+        self.cache.put(self._folder_key(folder_name), {'folders': root_folder.folders})
         return root_folder.folders
 
+    def walk(self, folder_name=None, max_workers=MAX_WORKERS, failed=None):
+        """
+        Lists recursively all the files below a folder of the document library.
+
+        The folders are listed concurrently, each worker with its own clone of this instance. The files are yielded as
+        soon as their folder is listed, so the order is not deterministic.
+
+        :param folder_name: Folder within the document library to start from (default: the root of the library).
+        :param max_workers: Number of folders listed at the same time (default: MAX_WORKERS).
+        :param failed: Optional list where the folders that can not be listed are appended. If it is not given and a
+            folder can not be listed, a RuntimeError is raised after the rest of the tree is walked, because the files
+            below that folder are missing.
+        :return: Generator of dictionaries with the file properties (as get_file_properties) plus folder, the folder
+            of the file inside the document library, and server_relative_url.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        workers = threading.local()
+
+        def _list(folder):
+            if not hasattr(workers, 'sp'):
+                workers.sp = self.clone()
+            return folder, workers.sp._list_folder(folder)
+
+        not_listed = []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            root = self._folder_key(folder_name)
+            pending = {executor.submit(_list, root): root}
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        folder = pending.pop(future)
+                        try:
+                            folder, (files, folders) = future.result()
+                        except Exception as e:
+                            self.log.error(f'Not possible to list the folder {folder} while walking {folder_name}.')
+                            self.log.error(f'Error: {e}')
+                            not_listed.append(folder)
+                            continue
+                        for sub_folder in folders:
+                            pending[executor.submit(_list, sub_folder)] = sub_folder
+                        for file in files:
+                            file['folder'] = folder
+                            yield file
+            finally:
+                # when the caller stops early, do not list the folders still in the queue
+                for future in pending:
+                    future.cancel()
+        if failed is not None:
+            failed.extend(not_listed)
+        elif not_listed:
+            raise RuntimeError(f'Not possible to list {len(not_listed)} folders while walking {folder_name}: '
+                               f'{", ".join(not_listed)}')
+
+    def _list_folder(self, folder):
+        """
+        Lists the files and subfolders of one folder.
+
+        SharePoint does not page the Files and Folders collections, they are returned whole unless $top is given, in
+        which case they are cut without a next page link, so no $top is sent.
+
+        :param folder: Folder inside the document library.
+        :return: Tuple with the list of file properties and the list of subfolders (as paths inside the library).
+        """
+        base_url = self._folder_api_url(folder)
+        files = []
+        folders = []
+        with self._measure('list', folder):
+            for item in self._iter_json(f'{base_url}/Files', {'$select': ','.join(FILE_FIELDS)}):
+                files.append(self._file_item(item))
+            for item in self._iter_json(f'{base_url}/Folders', {'$select': 'Name'}):
+                if folder == '' and item.get('Name') == 'Forms':  # system folder of the document library
+                    continue
+                folders.append(f'{folder}/{item.get("Name")}' if folder else item.get('Name'))
+        return files, folders
+
+    def _folder_api_url(self, folder):
+        """
+        Returns the REST URL of a folder of the document library.
+
+        :param folder: Folder inside the document library.
+        """
+        folder_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder}'.rstrip('/')
+        folder_url = quote(folder_url.replace("'", "''"))
+        return f"{self.__sharepoint_site_}/_api/web/getFolderByServerRelativePath(decodedurl='{folder_url}')"
+
+    @staticmethod
+    def _file_item(item):
+        """
+        Returns the properties of a file read with _iter_json as a dictionary, as get_file_properties plus
+        server_relative_url.
+
+        :param item: Item of the Files collection with the FILE_FIELDS.
+        """
+        return {
+            'file_id': item.get('UniqueId'),
+            'file_name': item.get('Name'),
+            'major_version': item.get('MajorVersion'),
+            'minor_version': item.get('MinorVersion'),
+            'file_size': int(item.get('Length') or 0),
+            'time_created': item.get('TimeCreated'),
+            'time_last_modified': item.get('TimeLastModified'),
+            'server_relative_url': item.get('ServerRelativeUrl')
+        }
+
+    def _iter_json(self, url, params=None):
+        """
+        Requests a REST collection and yields its items, following the next page links returned by the server.
+
+        :param url: Absolute REST URL of the collection.
+        :param params: Dictionary with the query options ($select, $filter, $top...) of the first page.
+        :return: Generator of the items of the collection as dictionaries.
+        """
+        if params:
+            url = f"{url}?{'&'.join(f'{k}={quote(str(v))}' for k, v in params.items())}"
+        while url:
+            request = RequestOptions(url)
+            request.set_header('Accept', 'application/json;odata=nometadata')
+            payload = self._send_request(request).json()
+            for item in payload.get('value', []):
+                yield item
+            url = payload.get('odata.nextLink')
+
+    @staticmethod
+    def _folder_key(folder_name):
+        """
+        Returns the key of a folder in the metadata cache: its path inside the document library, without leading or
+        trailing slashes.
+
+        :param folder_name: Folder inside the document library.
+        """
+        if folder_name is None:
+            return ''
+        key = Path(folder_name).as_posix().strip('/')
+        return '' if key == '.' else key
+
+    def invalidate_folder(self, folder_name, parents=False):
+        """
+        Removes a folder listing from the metadata cache, so the next listing is read from SharePoint.
+
+        :param folder_name: Folder inside the document library.
+        :param parents: If True, also removes the listings of all the parent folders, for when folders were created.
+        """
+        key = self._folder_key(folder_name)
+        self.cache.invalidate(key)
+        if parents:
+            for parent in Path(key).parents:
+                self.cache.invalidate(self._folder_key(parent.as_posix()))
+
     def download_file(self, file_name, folder_name):
         """
         Downloads a file from the specified folder in the SharePoint document library.
@@ -356,54 +882,410 @@ class SharePoint:
             self.getConnection()
         file_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_name}/{file_name}'
         try:
-            file = File.open_binary(self.ctx, file_url)
+            with self._measure('download', f'{folder_name}/{file_name}') as event:
+                file = self._execute(lambda: File.open_binary(self.ctx, file_url))
+                event['bytes'] = len(file.content or b'')
         except Exception as e:
             self.log.error(f'Not possible to download file.')
             self.log.error(f'Error: {e}')
             return None
         return file.content
 
-    def download_large_file(self, file_name, folder_name, local_path_name):
+    def iter_file(self, file_name, folder_name, block_size=BLOCK_SIZE):
+        """
+        Downloads a file from SharePoint as a stream of blocks, so the file is never fully in memory.
+
+        :param file_name: Name of the file to download.
+        :param folder_name: Name of the folder containing the file.
+        :param block_size: Maximum size of each block in bytes (default: 1MB).
+        :return: Generator that yields the content of the file in blocks of bytes. It raises the error if the download
+            fails.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        file_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_name}/{file_name}'
+        try:
+            request = RequestOptions(self._file_content_url(file_url))
+            request.stream = True
+            response = self._send_request(request)
+        except Exception as e:
+            self.log.error(f'Not possible to download file.')
+            self.log.error(f'Error: {e}')
+            raise
+        with response:
+            for block in response.iter_content(block_size):
+                yield block
+
+    def download_file_to(self, file_name, folder_name, destination, block_size=BLOCK_SIZE, transfer=None):
+        """
+        Downloads a file from SharePoint writing it in blocks to a local file or to a file-like object, so the memory
+        used does not depend on the size of the file.
+
+        :param file_name: Name of the file to download.
+        :param folder_name: Name of the folder containing the file.
+        :param destination: Local path of the file to write, or a binary file-like object.
+        :param block_size: Maximum size of each block in bytes (default: 1MB).
+        :param transfer: Progress.Transfer where the bytes written are reported after every block, or None.
+        :return: True if download succeeds, False otherwise. A partially written local path is removed.
+        """
+        is_path = isinstance(destination, (str, Path))
+        try:
+            with self._measure('download', f'{folder_name}/{file_name}') as event:
+                if is_path:
+                    with open(destination, 'wb') as local_file:
+                        for block in self.iter_file(file_name, folder_name, block_size):
+                            local_file.write(block)
+                            event['bytes'] += len(block)
+                            if transfer is not None:
+                                transfer.update(len(block))
+                else:
+                    for block in self.iter_file(file_name, folder_name, block_size):
+                        destination.write(block)
+                        event['bytes'] += len(block)
+                        if transfer is not None:
+                            transfer.update(len(block))
+        except Exception as e:
+            self.log.error(f'Not possible to save file {file_name}.')
+            self.log.error(f'Error: {e}')
+            if is_path and Path(destination).exists():
+                Path(destination).unlink()
+            return False
+        return True
+
+    def download_large_file(self, file_name, folder_name, local_path_name, max_workers=1, range_size=CHUNK_SIZE,
+                            show_progress=True):
         """
         Downloads a large file in chunks from SharePoint and saves it locally.
 
+        With max_workers greater than 1 the file is split in byte ranges of range_size that are downloaded concurrently,
+        each one over its own connection, and written at their offset in the local file.
+
         :param file_name: Name of the file to download.
         :param folder_name: Folder containing the file.
         :param local_path_name: Local path where the downloaded file should be saved.
+        :param max_workers: Number of byte ranges downloaded at the same time (default: 1, a single stream).
+        :param range_size: Size of each byte range when max_workers is greater than 1 (default: 20MB).
+        :param show_progress: If True, the bytes downloaded are reported to progress (default: True).
         :return: True if download succeeds, False otherwise.
         """
         if self.ctx is None:
             self.getConnection()
         file_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_name}/{file_name}'
         elapsed_time = ElapsedTime.ElapsedTime()
+        transfer = None
         try:
-            source_file = self.ctx.web.get_file_by_server_relative_path(file_url)
-            # Get the file size for the progress bar
-            file_info = source_file.get().execute_query()
-            total_size = int(file_info.length)
-            # Initialize the progress bar
-            self.pbar = tqdm(total=total_size, unit='B', unit_scale=True, desc="Downloading", ascii=True)
-            # download the file
-            with open(local_path_name, 'wb') as local_file:
-                source_file.download_session(local_file, self.bar_download_progress).execute_query()
-            self.pbar.close()
+            with self._measure('download', f'{folder_name}/{file_name}') as event:
+                source_file = self.ctx.web.get_file_by_server_relative_path(file_url)
+                # Get the file size for the progress bar
+                file_info = self._execute(lambda: source_file.get().execute_query())
+                total_size = int(file_info.length)
+                if show_progress:
+                    transfer = self.pbar = self.progress.transfer(total_size, file_name)
+                # download the file
+                if max_workers > 1 and total_size > range_size:
+                    # the ranges are retried in the worker threads, they are counted by _download_ranges
+                    event['retries'] = self._download_ranges(file_url, local_path_name, total_size, max_workers,
+                                                             range_size, transfer)
+                else:
+                    with open(local_path_name, 'wb') as local_file:
+                        self._execute(lambda: source_file.download_session(local_file, transfer).execute_query())
+                if transfer is not None:
+                    transfer.finish()
+                event['bytes'] = total_size
             self.log.info(f'File {file_name} downloaded successfully in {elapsed_time.elapsed()}')
         except Exception as e:
+            if transfer is not None:
+                transfer.finish(False)
             self.log.error(f'Not possible to download file.')
             self.log.error(f'Error: {e}')
             return False
+        finally:
+            self.pbar = None
         self.log.info(f'File {file_name} downloaded successfully.')
         return True
 
-    def upload_large_file(self, local_file_path, target_file_url, chunk_size=CHUNK_SIZE, _retry=-1):
+    def mirror(self, folder_name, local_folder, max_workers=MAX_WORKERS, pattern=None, show_progress=True):
+        """
+        Replicates a folder of the document library, with all its subfolders, to a local folder.
+
+        The remote files are listed with walk and downloaded concurrently, each worker with its own clone of this
+        instance. A file is skipped when the local copy has the size and the modification time of the remote file, so
+        refreshing a local copy only transfers what changed. Every file is downloaded to a temporary file in its local
+        folder that gets the modification time of the remote file and is then renamed to its name, so a local file is
+        never left half written.
+
+        :param folder_name: Folder within the document library to replicate.
+        :param local_folder: Local folder where the files are written, keeping the subfolders.
+        :param max_workers: Maximum number of files downloaded at the same time (default: MAX_WORKERS).
+        :param pattern: Optional regular expression, only the files whose name matches it are replicated.
+        :param show_progress: If True, the bytes of all the files are shown in one progress bar (default: True).
+        :return: Tuple with the list of per-file result dictionaries (remote_file_url, local_file_path, file_size,
+            success, skipped) and a summary dictionary (files, downloaded, skipped, failed, failed_folders, bytes,
+            elapsed, mb_per_second). The folders that can not be listed are in failed_folders and count as failed,
+            because their files are not replicated.
+        """
+        root = self._folder_key(folder_name)
+        local_folder = Path(local_folder)
+        elapsed_time = ElapsedTime.ElapsedTime(returnStr=False)
+        failed_folders = []
+        files = [f for f in self.walk(root, max_workers=max_workers, failed=failed_folders)
+                 if pattern is None or re.match(pattern, f['file_name'])]
+        workers = threading.local()
+
+        def _mirror(file):
+            if not hasattr(workers, 'sp'):
+                workers.sp = self.clone()
+            relative = Path(file['folder']).relative_to(root) if root else Path(file['folder'])
+            local_path = local_folder.joinpath(relative, file['file_name'])
+            mtime = _timestamp(file['time_last_modified'])
+            result = {'remote_file_url': f'{file["folder"]}/{file["file_name"]}', 'local_file_path': local_path,
+                      'file_size': file['file_size'], 'success': True, 'skipped': False}
+            if local_path.is_file():
+                st = local_path.stat()
+                if st.st_size == file['file_size'] and mtime is not None and int(st.st_mtime) == int(mtime):
+                    result['skipped'] = True
+                    return result
+            transfer = self.progress.transfer(file['file_size'], file['file_name']) if show_progress else None
+            local_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=f'.{file["file_name"]}.', suffix='.part', dir=local_path.parent)
+            os.close(fd)
+            try:
+                result['success'] = workers.sp.download_file_to(file['file_name'], file['folder'], temp_path,
+                                                                transfer=transfer)
+                if result['success']:
+                    if mtime is not None:
+                        os.utime(temp_path, (mtime, mtime))
+                    os.replace(temp_path, local_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                if transfer is not None:
+                    transfer.finish(result['success'])
+            return result
+
+        if show_progress:
+            self.progress.expect(sum(f['file_size'] for f in files))
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                for future in as_completed([executor.submit(_mirror, f) for f in files]):
+                    result = future.result()
+                    results.append(result)
+                    if result['skipped']:
+                        # the progress expected the bytes of the skipped file, they count as done
+                        if show_progress:
+                            self.progress.transfer(result['file_size']).finish(True)
+                    else:
+                        self.log.info(f'({len(results)}/{len(files)}) {result["remote_file_url"]}: '
+                                      f'{"ok" if result["success"] else "FAILED"}')
+        finally:
+            if show_progress:
+                self.progress.close()
+        elapsed = elapsed_time.end().total_seconds()
+        downloaded = [r for r in results if r['success'] and not r['skipped']]
+        downloaded_bytes = sum(r['file_size'] for r in downloaded)
+        summary = {
+            'files': len(results),
+            'downloaded': len(downloaded),
+            'skipped': sum(1 for r in results if r['skipped']),
+            'failed': sum(1 for r in results if not r['success']) + len(failed_folders),
+            'failed_folders': failed_folders,
+            'bytes': downloaded_bytes,
+            'elapsed': elapsed,
+            'mb_per_second': downloaded_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        }
+        self.log.info(f'Mirrored {folder_name} to {local_folder}: {summary["downloaded"]} files downloaded '
+                      f'({round(downloaded_bytes / (1024 * 1024), 2)} MB) in {ElapsedTime.td_format(elapsed_time.elapsed())} '
+                      f'[{round(summary["mb_per_second"], 2)} MB/s], {summary["skipped"]} unchanged, '
+                      f'{summary["failed"]} failed.')
+        if failed_folders:
+            self.log.error(f'The mirror of {folder_name} is incomplete, folders not listed: '
+                           f'{", ".join(failed_folders)}')
+        return results, summary
+
+    def _file_content_url(self, file_url):
+        """
+        Returns the REST URL of the content of a file.
+
+        :param file_url: Server relative URL of the file.
+        """
+        file_url = Path(file_url).as_posix().replace("'", "''")
+        return f"{self.__sharepoint_site_}/_api/web/getFileByServerRelativePath(decodedurl='{quote(file_url)}')/$value"
+
+    def _download_ranges(self, file_url, local_path_name, total_size, max_workers, range_size, transfer=None):
+        """
+        Downloads a file splitting it in byte ranges that are downloaded concurrently. The local file is allocated with
+        its final size first and every range is written at its offset. Each range is retried RANGE_RETRIES times.
+
+        :param file_url: Server relative URL of the file.
+        :param local_path_name: Local path where the downloaded file should be saved.
+        :param total_size: Size of the file in bytes.
+        :param max_workers: Number of byte ranges downloaded at the same time.
+        :param range_size: Size of each byte range.
+        :param transfer: Progress.Transfer where the bytes downloaded are reported, or None.
+        :return: Number of retries of the ranges.
+        """
+        with open(local_path_name, 'wb') as local_file:
+            local_file.truncate(total_size)
+        url = self._file_content_url(file_url)
+        workers = threading.local()
+        lock = threading.Lock()
+        retries = [0]
+
+        def _download_range(start, end):
+            if not hasattr(workers, 'sp'):
+                workers.sp = self.clone()
+            retries_start = self.scheduler.retries()
+            try:
+                with self._span('range'):
+                    _download_range_attempts(start, end)
+            finally:
+                with lock:
+                    retries[0] += self.scheduler.retries() - retries_start
+
+        def _download_range_attempts(start, end):
+            for attempt in range(RANGE_RETRIES + 1):
+                received = 0
+                try:
+                    request = RequestOptions(url)
+                    request.set_header('Range', f'bytes={start}-{end}')
+                    request.stream = True
+                    response = workers.sp._send_request(request)
+                    if response.status_code != 206:
+                        raise ValueError(f'The server did not return the range {start}-{end}.')
+                    with open(local_path_name, 'r+b') as local_file:
+                        local_file.seek(start)
+                        for block in response.iter_content(BLOCK_SIZE):
+                            local_file.write(block)
+                            received += len(block)
+                            if transfer is not None:
+                                transfer.update(len(block))
+                    if received != end - start + 1:
+                        raise ValueError(f'Range {start}-{end} incomplete, {received} bytes received.')
+                    return
+                except Exception as e:
+                    if transfer is not None:
+                        transfer.update(-received)
+                    if attempt == RANGE_RETRIES:
+                        raise
+                    self.log.warn(f'Range {start}-{end} failed, trying again... Error: {e}')
+                    self.scheduler.wait(attempt)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_download_range, start, min(start + range_size, total_size) - 1)
+                       for start in range(0, total_size, range_size)]
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception:
+                    # no need to download the rest if one range can not be downloaded
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+        return retries[0]
+
+    def upload_large_file(self, local_file_path, target_file_url, chunk_size=CHUNK_SIZE, show_progress=True,
+                          adaptive=False, skip_unchanged=False, _retry=-1):
         """
         Uploads a large file to SharePoint in chunks.
 
+        The state of the upload is kept in upload_sessions, so a retry continues from the last chunk acknowledged by
+        SharePoint, and also a new run after the process was stopped if upload_sessions is kept on disk.
+
+        With skip_unchanged, the content hash of the local file is computed (reading it by blocks) and the file is not
+        uploaded if it is the hash recorded in the manifest when the file was uploaded to the same target, and the
+        remote file still has the size of the local file (see is_unchanged). SharePoint does not give a content hash of
+        its files, so the hash of what was uploaded is kept in the manifest.
+
         :param local_file_path: Path to the local file to be uploaded.
         :param target_file_url: Target URL where the file should be uploaded.
-        :param chunk_size: Size of each chunk (default: 10MB).
+        :param chunk_size: Size of each chunk (default: 20MB).
+        :param show_progress: If True, the bytes uploaded are reported to progress after each chunk (default: True).
+        :param adaptive: If True, chunk_size is only the size of the first chunk, the next ones grow or shrink with
+            the measured throughput (see next_chunk_size) (default: False).
+        :param skip_unchanged: If True, the file is not uploaded when it is unchanged, and its content hash is
+            recorded in the manifest when it is uploaded. It needs a manifest (default: False).
         :param _retry: Number of retries in case of failure (default: -1 for infinite retries).
-        :return: True if upload succeeds, False otherwise.
+        :return: True if upload succeeds or the file is unchanged, False otherwise.
+        """
+        return self._upload_or_skip(local_file_path, target_file_url, chunk_size=chunk_size,
+                                    show_progress=show_progress, adaptive=adaptive, skip_unchanged=skip_unchanged,
+                                    _retry=_retry)[0]
+
+    def _upload_or_skip(self, local_file_path, target_file_url, chunk_size=CHUNK_SIZE, show_progress=True,
+                        adaptive=False, skip_unchanged=False, _retry=-1):
+        """
+        Uploads a file as upload_large_file, telling if it was skipped because it was unchanged.
+
+        :return: Tuple (success, skipped).
+        """
+        if skip_unchanged and self.manifest is None:
+            self.log.warn(f'There is no manifest to skip the unchanged files, uploading {Path(local_file_path).name}.')
+            skip_unchanged = False
+        transfer = None
+        if show_progress:
+            size = os.path.getsize(local_file_path) if Path(local_file_path).is_file() else 0
+            transfer = self.pbar = self.progress.transfer(size, Path(local_file_path).name)
+        success = skipped = False
+        try:
+            with self._measure('upload', target_file_url) as event:
+                content_hash = None
+                if skip_unchanged:
+                    with self._span('hash'):
+                        content_hash = self.manifest.content_hash(local_file_path)
+                    skipped = self.is_unchanged(local_file_path, target_file_url, content_hash)
+                if skipped:
+                    success = True
+                    event['outcome'] = TransferMetrics.OUTCOME_SKIPPED
+                    # record the new modification time, so the next time the hash is not computed again
+                    self.manifest.mark_uploaded(local_file_path, target_file_url, content_hash=content_hash)
+                    self.log.info(f'File {Path(local_file_path).name} is unchanged, it is not uploaded.')
+                else:
+                    success = self._upload_large_file(local_file_path, target_file_url, chunk_size=chunk_size,
+                                                      transfer=transfer, adaptive=adaptive, _retry=_retry)
+                    if success:
+                        event['bytes'] = os.path.getsize(local_file_path)
+                        if content_hash is not None:
+                            self.manifest.mark_uploaded(local_file_path, target_file_url, content_hash=content_hash)
+                    else:
+                        event['outcome'] = TransferMetrics.OUTCOME_FAILED
+        finally:
+            self.pbar = None
+            if transfer is not None:
+                transfer.finish(success)
+        return success, skipped
+
+    def is_unchanged(self, local_file_path, target_file_url, content_hash=None):
+        """
+        Checks if a remote file has the content of a local file: the local file was uploaded to the same target with
+        the same content hash, as recorded in the manifest, and the remote file has the size of the local file.
+
+        :param local_file_path: Path to the local file.
+        :param target_file_url: Path of the file in the document library.
+        :param content_hash: Content hash of the local file, computed if it is not given.
+        :return: True if the file does not need to be uploaded, False otherwise or if there is no manifest.
+        """
+        if self.manifest is None:
+            return False
+        target_file_url = Path(target_file_url)
+        record = self.manifest.get(local_file_path)
+        if record is None or not record['content_hash'] or record['remote_state'] != SyncManifest.STATE_UPLOADED \
+                or record['remote_url'] != target_file_url.as_posix():
+            return False
+        if content_hash is None:
+            content_hash = self.manifest.content_hash(local_file_path)
+        if content_hash != record['content_hash']:
+            return False
+        # the hash says the content is the one uploaded, the size checks that the remote file is still there
+        with self._span('check'):
+            file_properties = self.get_file_properties(target_file_url.name, target_file_url.parent.as_posix())
+        return file_properties is not None and int(file_properties['file_size']) == os.path.getsize(local_file_path)
+
+    def _upload_large_file(self, local_file_path, target_file_url, chunk_size=CHUNK_SIZE, transfer=None,
+                           adaptive=False, _retry=-1):
+        """
+        Uploads a large file to SharePoint in chunks, retrying the whole upload if it fails. See upload_large_file, the
+        bytes uploaded are reported to transfer.
         """
         if self.ctx is None:
             self.getConnection()
@@ -412,90 +1294,502 @@ class SharePoint:
         # make sure the folder exists on SharePoint, if not, it is created
         target_folder_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{target_file_url.parent.as_posix()}'
         try:
-            self.ctx.web.ensure_folder_path(target_folder_url).execute_query()
+            with self._span('ensure_folder'):
+                self._ensure_folder(target_file_url.parent.as_posix())
         except Exception as e:
             self.log.error(f'Not possible to upload file. When try to create folder {target_folder_url} for file {target_file_url.name}.')
             self.log.error(f'Error: {e}')
-            if _retry == -1:
-                self.log.info(f'Trying again...')
-                self.upload_large_file(local_file_path, target_file_url, _retry=5)
-            elif _retry > 0:
-                self.log.info(f'And trying again...')
-                self.upload_large_file(local_file_path, target_file_url, _retry=_retry - 1)
-            else:
-                self.log.fatal(f'Not possible to upload {local_file_path} to {target_file_url}!!!')
-            return False
+            return self._retry_upload_large_file(local_file_path, target_file_url, _retry, chunk_size=chunk_size,
+                                                 transfer=transfer, adaptive=adaptive)
         targ_file_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{target_file_url.as_posix()}'
         self.log.info(f'Uploading file {local_file_path} to {targ_file_url}...')
         elapsed_time = ElapsedTime.ElapsedTime()
+        file_name = os.path.basename(targ_file_url)
         try:
-            self.__total_size_ = os.path.getsize(local_file_path)
-            with open(local_file_path, 'rb') as local_file:
-                file_name = os.path.basename(targ_file_url)
-                folder_url = os.path.dirname(targ_file_url)
-                folder = self.ctx.web.get_folder_by_server_relative_url(folder_url)
-                upload_session = folder.files.create_upload_session(
-                    file_name=file_name,
-                    file=local_file,
-                    chunk_size=chunk_size,
-                    chunk_uploaded=self.bar_upload_progress
-                )
-                upload_session.execute_query()
-            print()
+            total_size = os.path.getsize(local_file_path)
+            with self._span('upload_session'):
+                upload_session = self._upload_in_chunks(local_file_path, targ_file_url, chunk_size, transfer, adaptive)
+            self.invalidate_folder(target_file_url.parent.as_posix())
             self.log.info(f'Upload completed in {elapsed_time.elapsed()}')
         except Exception as e:
             self.log.error(f'Not possible to upload file {file_name}.')
             self.log.error(f'Error: {e}')
-            if _retry == -1:
-                self.log.info(f'Trying again...')
-                self.upload_large_file(local_file_path, target_file_url, _retry=5)
-            elif _retry > 0:
-                self.log.info(f'And trying again...')
-                self.upload_large_file(local_file_path, target_file_url, _retry=_retry - 1)
+            # the folder could have been removed, the retry checks it again
+            self._forget_folder(target_file_url.parent.as_posix())
+            return self._retry_upload_large_file(local_file_path, target_file_url, _retry, chunk_size=chunk_size,
+                                                 transfer=transfer, adaptive=adaptive)
+        # the upload session returns the properties of the uploaded file, use them to verify the size and only ask
+        # SharePoint for the file if they are not there
+        file_size_sp = None
+        if upload_session.is_property_available('Length'):
+            file_size_sp = int(upload_session.length)
+        if file_size_sp != total_size:
+            with self._span('verify'):
+                file_properties = self.get_file_properties(file_name, target_file_url.parent.as_posix())
+            if file_properties is None:
+                file_size_sp = 0
             else:
-                self.log.fatal(f'Not possible to upload {local_file_path} to {targ_file_url}!!!')
-                return False
-        file_properties = self.get_file_properties(file_name, target_file_url.parent.as_posix())
-        if file_properties is None:
-            file_size_sp = 0
-        else:
-            file_size_sp = file_properties['file_size']
-        if file_size_sp != self.__total_size_:  # check if the file was uploaded correctly
-            self.log.error(f'File {file_name} uploaded incorrectly. {file_size_sp} != {self.__total_size_}')
-            if _retry == -1:
-                self.log.info(f'Trying again...')
-                self.upload_large_file(local_file_path, target_file_url, _retry=5)
-            elif _retry > 0:
-                self.log.info(f'And trying again...')
-                self.upload_large_file(local_file_path, target_file_url, _retry=_retry - 1)
+                file_size_sp = int(file_properties['file_size'])
+        if file_size_sp != total_size:  # check if the file was uploaded correctly
+            self.log.error(f'File {file_name} uploaded incorrectly. {file_size_sp} != {total_size}')
+            return self._retry_upload_large_file(local_file_path, target_file_url, _retry, chunk_size=chunk_size,
+                                                 transfer=transfer, adaptive=adaptive)
+        self.log.info(f'File {file_name} uploaded successfully.')
+        return True
+
+    def _upload_in_chunks(self, local_file_path, targ_file_url, chunk_size, chunk_uploaded=None, adaptive=False):
+        """
+        Uploads a file with a chunked upload session, resuming the session stored in upload_sessions if there is one for
+        the same local file. A session is stored once SharePoint acknowledges its first chunk, and it is removed when
+        SharePoint rejects it (see _session_rejected), so a session that expired is not tried again.
+
+        :param local_file_path: Path to the local file to be uploaded.
+        :param targ_file_url: Server relative URL of the target file.
+        :param chunk_size: Size of each chunk.
+        :param chunk_uploaded: Callback called with the number of bytes acknowledged after each chunk.
+        :param adaptive: If True, the size of each chunk is adjusted with the time the previous one took.
+        :return: The uploaded File, with the properties returned by SharePoint.
+        """
+        total_size = os.path.getsize(local_file_path)
+        folder = self.ctx.web.get_folder_by_server_relative_url(os.path.dirname(targ_file_url))
+        file_name = os.path.basename(targ_file_url)
+        with open(local_file_path, 'rb') as local_file:
+            if total_size <= chunk_size:  # only one chunk, no session is needed
+                content = local_file.read()
+                uploaded_file = self._execute(lambda: folder.files.add(file_name, content, True).execute_query())
+                if callable(chunk_uploaded):
+                    chunk_uploaded(total_size)
+                return uploaded_file
+            session = self.upload_sessions.get(targ_file_url, local_file_path)
+            if session is None:
+                upload_id = str(uuid.uuid4())
+                offset = 0
+                uploaded_file = self._execute(lambda: folder.files.add(file_name, None, True).execute_query())
             else:
-                self.log.fatal(f'Not possible to upload {local_file_path} to {targ_file_url}!!!')
+                upload_id = session['upload_id']
+                offset = session['offset']
+                uploaded_file = self.ctx.web.get_file_by_server_relative_path(targ_file_url)
+                self.log.info(f'Resuming upload of {file_name} from {round(offset / (1024 * 1024), 2)} MB')
+            acknowledged = False
+            local_file.seek(offset)
+            try:
+                while True:
+                    chunk = local_file.read(chunk_size)
+                    if offset + len(chunk) >= total_size:
+                        with self._span('chunk'):
+                            self._execute(
+                                lambda: uploaded_file.finish_upload(upload_id, offset, chunk).execute_query())
+                        self.upload_sessions.remove(targ_file_url)
+                        if callable(chunk_uploaded):
+                            chunk_uploaded(total_size)
+                        return uploaded_file
+
+                    sent_in = []
+
+                    def _send_chunk():
+                        # only the transfer is timed, not the waits of the scheduler or the retries of other attempts
+                        started = perf_counter()
+                        if offset == 0:
+                            sent = uploaded_file.start_upload(upload_id, chunk)
+                        else:
+                            sent = uploaded_file.continue_upload(upload_id, offset, chunk)
+                        self.ctx.execute_query()
+                        sent_in.append(perf_counter() - started)
+                        return sent
+
+                    with self._span('chunk'):
+                        result = self._execute(_send_chunk)
+                    if session is None and not acknowledged:
+                        # StartUpload was acknowledged, from now on the session can be resumed
+                        self.upload_sessions.start(targ_file_url, local_file_path, upload_id)
+                    # SharePoint returns the offset it has committed
+                    offset = int(result.value) if result.value else offset + len(chunk)
+                    acknowledged = True
+                    self.upload_sessions.update(targ_file_url, offset)
+                    if callable(chunk_uploaded):
+                        chunk_uploaded(offset)
+                    if adaptive:
+                        chunk_size = next_chunk_size(len(chunk), sent_in[-1])
+            except Exception as e:
+                if _session_rejected(e):
+                    # SharePoint does not know the upload id or the offset, the next try starts from the beginning
+                    self.upload_sessions.remove(targ_file_url)
+                raise
+
+    def _retry_upload_large_file(self, local_file_path, target_file_url, _retry, **kwargs):
+        """
+        Retries a failed _upload_large_file call, counting down the remaining retries.
+
+        :param kwargs: Options of upload_large_file for the retry.
+        :return: The result of the retry, or False if there are no retries left.
+        """
+        if _retry == -1:
+            self.log.info(f'Trying again...')
+            self.scheduler.wait(0)
+            return self._upload_large_file(local_file_path, target_file_url, _retry=5, **kwargs)
+        elif _retry > 0:
+            self.log.info(f'And trying again...')
+            self.scheduler.wait(6 - _retry)
+            return self._upload_large_file(local_file_path, target_file_url, _retry=_retry - 1, **kwargs)
+        self.log.fatal(f'Not possible to upload {local_file_path} to {target_file_url}!!!')
+        return False
+
+    def upload_large_files(self, files, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS, file_uploaded=None,
+                           adaptive=False, show_progress=True, skip_unchanged=False):
+        """
+        Uploads many files concurrently using a bounded pool of workers around upload_large_file.
+
+        Every worker thread uses its own clone of this instance, so all of them share the same authentication.
+
+        :param files: Iterable of (local_file_path, target_file_url) pairs.
+        :param chunk_size: Size of each chunk (default: 20MB).
+        :param max_workers: Maximum number of files uploaded at the same time (default: MAX_WORKERS).
+        :param file_uploaded: Optional callback called with the result dictionary of each file when it finishes. It is
+            called from the calling thread.
+        :param adaptive: If True, the chunk size of each file adapts to the measured throughput (default: False).
+        :param show_progress: If True, the bytes of all the files are shown in one progress bar (default: True).
+        :param skip_unchanged: If True, the unchanged files are not uploaded, see upload_large_file (default: False).
+        :return: Tuple with the list of per-file result dictionaries (local_file_path, target_file_url, file_size,
+            success, skipped, elapsed) and a summary dictionary (files, succeeded, failed, skipped, bytes, elapsed,
+            mb_per_second). The bytes are only the ones uploaded, the skipped files are not counted.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        files = [(Path(local), Path(target)) for local, target in files]
+        workers = threading.local()
+
+        def _upload(local_file_path, target_file_url):
+            if not hasattr(workers, 'sp'):
+                workers.sp = self.clone()
+            et_file = ElapsedTime.ElapsedTime(returnStr=False)
+            success, skipped = workers.sp._upload_or_skip(local_file_path, target_file_url, chunk_size=chunk_size,
+                                                          show_progress=show_progress, adaptive=adaptive,
+                                                          skip_unchanged=skip_unchanged)
+            return {
+                'local_file_path': local_file_path,
+                'target_file_url': target_file_url,
+                'file_size': os.path.getsize(local_file_path) if local_file_path.is_file() else 0,
+                'success': success,
+                'skipped': skipped,
+                'elapsed': et_file.end().total_seconds()
+            }
+
+        # all the folders are created first, so the uploads do not check them
+        self.provision_folders({target.parent.as_posix() for _, target in files}, max_workers=max_workers)
+        if show_progress:
+            # the clones share the progress, so the total of all the files is known from the start
+            self.progress.expect(sum(os.path.getsize(local) for local, _ in files if local.is_file()))
+        elapsed_time = ElapsedTime.ElapsedTime(returnStr=False)
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                futures = [executor.submit(_upload, local, target) for local, target in files]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    status = 'unchanged' if result['skipped'] else 'ok' if result['success'] else 'FAILED'
+                    self.log.info(f'({len(results)}/{len(files)}) {result["local_file_path"].name}: {status}')
+                    if callable(file_uploaded):
+                        file_uploaded(result)
+        finally:
+            if show_progress:
+                self.progress.close()
+        elapsed = elapsed_time.end().total_seconds()
+        uploaded_bytes = sum(r['file_size'] for r in results if r['success'] and not r['skipped'])
+        summary = {
+            'files': len(results),
+            'succeeded': sum(1 for r in results if r['success']),
+            'failed': sum(1 for r in results if not r['success']),
+            'skipped': sum(1 for r in results if r['skipped']),
+            'bytes': uploaded_bytes,
+            'elapsed': elapsed,
+            'mb_per_second': uploaded_bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0
+        }
+        self.log.info(f'Uploaded {summary["succeeded"]} of {summary["files"]} files '
+                      f'({round(uploaded_bytes / (1024 * 1024), 2)} MB) in {ElapsedTime.td_format(elapsed_time.elapsed())} '
+                      f'[{round(summary["mb_per_second"], 2)} MB/s], {summary["skipped"]} unchanged, '
+                      f'{summary["failed"]} failed.')
+        return results, summary
+
+    def upload_bundled(self, local_folder, target_folder, window=Bundles.BUNDLE_WINDOW,
+                       max_file_size=Bundles.BUNDLE_MAX_FILE_SIZE, staging=None, chunk_size=CHUNK_SIZE,
+                       max_workers=MAX_WORKERS, show_progress=True, skip_unchanged=False):
+        """
+        Uploads all the files below a local folder, packing the small ones into compressed archives by time window.
+
+        The small files of every folder are grouped by the time window of their modification time and every group is
+        written into one archive (Bundles.bundle_name, for example bundle_20260101_000000_<content hash>.zip), so a day
+        of tiny files costs one transfer instead of thousands. The bigger files are uploaded as they are. The archives
+        and the big files are uploaded with upload_large_files, and the index (Bundles.BUNDLE_INDEX) of every remote
+        folder is updated with the archive where each file is, see download_from_bundle. The archives skipped by
+        skip_unchanged are also recorded, so a run whose index could not be uploaded is completed by the next one; the
+        index is only uploaded when it changes.
+
+        The archives are named by their content, so the archive of a window uploaded by an earlier run is not
+        overwritten when the window has other files now: its files that are not in the new archive, for example
+        because they were removed locally, are still found in it through the index. The archives of the same files
+        are always the same, so with a staging folder that is kept between runs and skip_unchanged, only the archives
+        of the windows with new or changed files are uploaded again.
+
+        :param local_folder: Local folder with the files.
+        :param target_folder: Folder of the document library where the files are uploaded, keeping the subfolders.
+        :param window: Seconds of the time window of every archive (default: Bundles.BUNDLE_WINDOW, a day).
+        :param max_file_size: Files bigger than this are uploaded without bundling (default: 1 MB).
+        :param staging: Local folder where the archives are written (default: a temporary folder, removed at the end).
+        :param chunk_size: Size of each chunk of the uploads (default: 20MB).
+        :param max_workers: Maximum number of archives or files uploaded at the same time (default: MAX_WORKERS).
+        :param show_progress: If True, the bytes of all the uploads are shown in one progress bar (default: True).
+        :param skip_unchanged: If True, the unchanged archives and files are not uploaded, see upload_large_file
+            (default: False).
+        :return: Tuple with the results and the summary of upload_large_files, the summary also has bundled (number of
+            small files packed), bundles (number of archives) and index_failed (number of indexes not updated).
+        """
+        local_folder = Path(local_folder)
+        files = [f for f in local_folder.rglob('*') if f.is_file()]
+        groups, large = Bundles.group_files(files, local_folder, window, max_file_size)
+        temporary = None
+        if staging is None:
+            temporary = tempfile.TemporaryDirectory()
+            staging = temporary.name
+        try:
+            uploads, bundles = [], {}
+            for (folder, start), group in sorted(groups.items()):
+                archive, entries = Bundles.build_bundle(group, Path(staging, folder), start)
+                bundles[archive] = (folder, start, entries)
+                uploads.append((archive, Path(target_folder, folder, archive.name)))
+            uploads += [(f, Path(target_folder, f.relative_to(local_folder))) for f in large]
+            self.log.info(f'{sum(len(g) for g in groups.values())} small files packed in {len(groups)} archives, '
+                          f'{len(large)} files not bundled')
+            results, summary = self.upload_large_files(uploads, chunk_size=chunk_size, max_workers=max_workers,
+                                                       show_progress=show_progress, skip_unchanged=skip_unchanged)
+            # the index of every remote folder gets the files of all its archives in SharePoint, also the skipped ones
+            uploaded = {}
+            for result in results:
+                if result['success'] and result['local_file_path'] in bundles:
+                    folder, start, entries = bundles[result['local_file_path']]
+                    uploaded.setdefault(folder, []).append((result['local_file_path'].name, entries, start))
+            index_failed = 0
+            for folder, archives in uploaded.items():
+                remote_folder = Path(target_folder, folder).as_posix()
+                index = self.get_bundle_index(remote_folder)
+                before = Bundles.dump_index(index)
+                for name, entries, start in archives:
+                    Bundles.add_to_index(index, name, entries, start)
+                for name in Bundles.prune_index(index):
+                    self.log.info(f'All the files of {remote_folder}/{name} are in newer archives.')
+                if Bundles.dump_index(index) == before:
+                    continue
+                if self.upload_file(Bundles.BUNDLE_INDEX, remote_folder, Bundles.dump_index(index)) is None:
+                    self.log.error(f'Not possible to update the index of the archives of {remote_folder}.')
+                    index_failed += 1
+        finally:
+            if temporary is not None:
+                temporary.cleanup()
+        summary['bundled'] = sum(len(g) for g in groups.values())
+        summary['bundles'] = len(groups)
+        summary['index_failed'] = index_failed
+        return results, summary
+
+    def get_bundle_index(self, folder_name):
+        """
+        Reads the index of the archives of a folder written by upload_bundled.
+
+        :param folder_name: Folder of the document library.
+        :return: The index (see Bundles.new_index), empty if the folder has no index.
+        """
+        files = self.get_files_list(folder_name)
+        if files is None or Bundles.BUNDLE_INDEX not in [f.name for f in files]:
+            return Bundles.new_index()
+        return Bundles.read_index(self.download_file(Bundles.BUNDLE_INDEX, folder_name))
+
+    def download_from_bundle(self, file_name, folder_name, destination, index=None):
+        """
+        Downloads one file uploaded by upload_bundled: the archive where it is, found in the index of the folder, is
+        downloaded to a temporary file and the file is extracted from it.
+
+        :param file_name: Name of the file.
+        :param folder_name: Folder of the document library where the file was uploaded.
+        :param destination: Local path, or an open binary file object, where the file is written. A local path gets the
+            modification time of the original file.
+        :param index: Index of the folder, to not read it again when many files are extracted (default: it is read).
+        :return: True if the file was extracted, False otherwise.
+        """
+        if index is None:
+            index = self.get_bundle_index(folder_name)
+        entry = index['files'].get(file_name)
+        if entry is None:
+            self.log.error(f'File {file_name} is not in the archives of {folder_name}.')
+            return False
+        with tempfile.TemporaryFile() as archive:
+            if not self.download_file_to(entry['bundle'], folder_name, archive):
                 return False
-        self.log.info(f'File {file_name} uploaded successfully.')
+            try:
+                Bundles.extract(archive, file_name, destination)
+            except (KeyError, zipfile.BadZipFile) as e:
+                self.log.error(f'Not possible to extract {file_name} from {folder_name}/{entry["bundle"]}.')
+                self.log.error(f'Error: {e}')
+                return False
+        if isinstance(destination, (str, Path)):
+            os.utime(destination, (entry['mtime'], entry['mtime']))
         return True
 
+    def latest_n(self, folder_name, n=1):
+        """
+        Retrieves the most recently modified files of a folder.
+
+        SharePoint sorts the files and returns only the first n ($orderby and $top), so the cost does not depend on the
+        number of files in the folder.
+
+        :param folder_name: Folder within the document library.
+        :param n: Number of files (default: 1).
+        :return: List with the properties of the files (as walk, without folder), the newest first, or None if the
+            folder is not accessible.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        folder = self._folder_key(folder_name)
+        params = {'$select': ','.join(FILE_FIELDS), '$orderby': 'TimeLastModified desc', '$top': n}
+        try:
+            with self._measure('list', folder):
+                # the server can still offer a next page, only the first n items are read
+                items = itertools.islice(self._iter_json(f'{self._folder_api_url(folder)}/Files', params), n)
+                return [self._file_item(item) for item in items]
+        except Exception as e:
+            self.log.error(f'Not possible to get the latest files of {folder_name}.')
+            self.log.error(f'Error: {e}')
+            return None
+
     def download_latest_file(self, folder_name):
         """
         Downloads the most recently modified file from a specified folder in SharePoint.
 
+        Only the newest file is requested to SharePoint (see latest_n), not the whole folder.
+
         :param folder_name: Name of the folder to retrieve the latest file from.
         :return: Tuple of latest file name and its content, or None if the download fails.
         """
-        date_format = "%Y-%m-%dT%H:%M:%SZ"
-        files_list = self.get_files_list(folder_name)
-        if files_list is None:
+        latest = self.latest_n(folder_name, 1)
+        if not latest:
             return None
-        file_dict = {}
-        for file in files_list:
-            dt_obj = datetime.datetime.strptime(file.time_last_modified, date_format)
-            file_dict[file.name] = dt_obj
-        # sort dict object to get the latest file
-        file_dict_sorted = {key: value for key, value in
-                            sorted(file_dict.items(), key=lambda item: item[1], reverse=True)}
-        latest_file_name = next(iter(file_dict_sorted))
+        latest_file_name = latest[0]['file_name']
         content = self.download_file(latest_file_name, folder_name)
         return latest_file_name, content
 
+    def _list_api_url(self):
+        """
+        Returns the REST URL of the list of the document library.
+        """
+        list_url = quote(f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}'.replace("'", "''"))
+        return f"{self.__sharepoint_site_}/_api/web/getList('{list_url}')"
+
+    def current_change_token(self):
+        """
+        Retrieves the current change token of the document library, the point of the change log where a change feed
+        starts.
+
+        :return: The change token, or None if it is not possible to get it.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        request = RequestOptions(f'{self._list_api_url()}?$select=CurrentChangeToken')
+        request.set_header('Accept', 'application/json;odata=nometadata')
+        try:
+            return self._send_request(request).json()['CurrentChangeToken']['StringValue']
+        except Exception as e:
+            self.log.error(f'Not possible to get the current change token of {self.__sharepoint_doc_}.')
+            self.log.error(f'Error: {e}')
+            return None
+
+    def get_changes(self, since=None, folder_name=None, fetch_limit=CHANGES_FETCH_LIMIT):
+        """
+        Retrieves the items of the document library added, updated, deleted, renamed, moved or restored after a change
+        token, reading the change log (GetChanges) of the library instead of listing its folders.
+
+        The changes are read fetch_limit at a time until there are no more. The folder listings of the changed items are
+        removed from the metadata cache.
+
+        :param since: Change token where the feed starts. If it is None, no changes are returned with the current
+            token, to start the feed from now.
+        :param folder_name: Optional folder within the document library, only the changes below it are returned. The
+            deletions without a path are always returned.
+        :param fetch_limit: Number of changes requested at a time (default: CHANGES_FETCH_LIMIT).
+        :return: Tuple with the list of changes (dictionaries with change_type, one of CHANGE_TYPES, item_id,
+            unique_id, server_relative_url, path inside the document library or None, time and token), oldest first,
+            and the token to use in the next call; or None if the change log can not be read, for example if the token
+            is too old.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        if since is None:
+            token = self.current_change_token()
+            return None if token is None else ([], token)
+        root = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}'
+        folder = self._folder_key(folder_name)
+        changes = []
+        token = since
+        try:
+            with self._measure('changes', folder):
+                while True:
+                    query = {'Item': True, 'Add': True, 'Update': True, 'DeleteObject': True, 'Rename': True,
+                             'Move': True, 'Restore': True, 'FetchLimit': fetch_limit,
+                             'ChangeTokenStart': {'StringValue': token}}
+                    request = RequestOptions(f'{self._list_api_url()}/getChanges')
+                    request.method = HttpMethod.Post
+                    request.data = {'query': query}
+                    request.set_header('Accept', 'application/json;odata=nometadata')
+                    request.set_header('Content-Type', 'application/json;odata=nometadata')
+                    items = self._send_request(request).json().get('value', [])
+                    for item in items:
+                        token = (item.get('ChangeToken') or {}).get('StringValue') or token
+                        url = item.get('ServerRelativeUrl') or None
+                        path = url[len(root) + 1:] if url and url.startswith(f'{root}/') else None
+                        if folder and path is not None and path != folder and not path.startswith(f'{folder}/'):
+                            continue
+                        if path is not None:
+                            self.invalidate_folder(posixpath.dirname(path))
+                        changes.append({
+                            'change_type': CHANGE_TYPES.get(item.get('ChangeType'), item.get('ChangeType')),
+                            'item_id': item.get('ItemId'),
+                            'unique_id': item.get('UniqueId'),
+                            'server_relative_url': url,
+                            'path': path,
+                            'time': item.get('Time'),
+                            'token': token
+                        })
+                    if len(items) < fetch_limit:
+                        break
+        except Exception as e:
+            self.log.error(f'Not possible to read the changes of {self.__sharepoint_doc_} since {since}.')
+            self.log.error(f'Error: {e}')
+            return None
+        return changes, token
+
+    def changes_since_last_run(self, tokens=None, folder_name=None, save=True):
+        """
+        Retrieves the changes of the document library since the last run, with the change token kept in a local file.
+
+        The first run only saves the current token and returns no changes, the next ones return the changes made
+        after the last saved token (see get_changes). With save=False the new token is not saved, so it can be saved
+        with tokens.put(key, token) once the changes are processed.
+
+        :param tokens: ChangeTokens object or path of its file (default: change_tokens.json in the current working
+            directory).
+        :param folder_name: Optional folder within the document library, only the changes below it are returned.
+        :param save: If True, the new token is saved (default: True).
+        :return: Tuple with the list of changes, the key of the token and the new token; or None if the changes can not
+            be read, the saved token is kept.
+        """
+        if not isinstance(tokens, ChangeTokens.ChangeTokens):
+            tokens = ChangeTokens.ChangeTokens(tokens)
+        key = f'{self.__sharepoint_site_}/{self.__sharepoint_doc_}/{self._folder_key(folder_name)}'.rstrip('/')
+        result = self.get_changes(tokens.get(key), folder_name)
+        if result is None:
+            return None
+        changes, token = result
+        if save:
+            tokens.put(key, token)
+        return changes, key, token
+
     def upload_file(self, file_name, folder_name, content):
         """
         Uploads a small file to the specified folder in SharePoint.
@@ -509,14 +1803,87 @@ class SharePoint:
             self.getConnection()
         target_folder_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_name}'
         try:
-            target_folder = self.ctx.web.get_folder_by_server_relative_path(target_folder_url)
-            return target_folder.upload_file(file_name, content).execute_query()
+            with self._measure('upload', f'{folder_name}/{file_name}') as event:
+                target_folder = self.ctx.web.get_folder_by_server_relative_path(target_folder_url)
+                result = self._execute(lambda: target_folder.upload_file(file_name, content).execute_query())
+                event['bytes'] = len(content) if isinstance(content, (bytes, str)) else 0
+            self.invalidate_folder(folder_name)
+            return result
         except Exception as e:
             self.log.error(f'Not possible to upload file.')
             self.log.error(f'Error: {e}')
             return None
 
-    def upload_file_in_chunks(self, file_path, folder_name, chunk_size, chunk_uploaded=None, **kwargs):
+    def upload_files_batch(self, files, folder_name, batch_size=BATCH_SIZE):
+        """
+        Uploads many small files to the specified folder grouping the uploads in $batch requests, so the overhead of a
+        request is paid once per batch instead of once per file.
+
+        The $batch body is written here, every upload in its own change set with the binary content of the file, because
+        the batches of the client library encode the body of every request as JSON, which the content of a file is not.
+
+        :param files: Iterable of (file_name, content) pairs. The content is bytes, or the local path of the file as
+            str or Path, read when its batch is sent.
+        :param folder_name: Folder in which to upload the files.
+        :param batch_size: Number of files in each $batch request (default: 100, the maximum of SharePoint).
+        :return: List of dictionaries with file_name and success for every file.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        files_url = f'{self._folder_api_url(self._folder_key(folder_name))}/Files'
+        files = list(files)
+        results = []
+        for idx in range(0, len(files), batch_size):
+            batch = files[idx:idx + batch_size]
+            sizes = {}
+
+            def _batch_request():
+                boundary = f'batch_{uuid.uuid4()}'
+                body = []
+                for file_name, content in batch:
+                    if isinstance(content, (str, os.PathLike)):
+                        with open(content, 'rb') as f:
+                            content = f.read()
+                    sizes[file_name] = len(content)
+                    changeset = f'changeset_{uuid.uuid4()}'
+                    name = quote(file_name.replace("'", "''"))
+                    body += [f'--{boundary}\r\nContent-Type: multipart/mixed; boundary={changeset}\r\n\r\n'
+                             f'--{changeset}\r\nContent-Type: application/http\r\n'
+                             f'Content-Transfer-Encoding: binary\r\n\r\n'
+                             f"POST {files_url}/add(url='{name}',overwrite=true) HTTP/1.1\r\n"
+                             f'Accept: application/json;odata=nometadata\r\nContent-Type: application/octet-stream\r\n'
+                             f'Content-Length: {len(content)}\r\n\r\n'.encode(), content,
+                             f'\r\n--{changeset}--\r\n'.encode()]
+                body.append(f'--{boundary}--\r\n'.encode())
+                request = RequestOptions(f'{self.__sharepoint_site_}/_api/$batch')
+                request.method = HttpMethod.Post
+                request.data = b''.join(body)
+                request.set_header('Content-Type', f'multipart/mixed; boundary={boundary}')
+                return request
+
+            with self._measure('upload_batch', folder_name) as event:
+                statuses = []
+                try:
+                    statuses = _batch_statuses(self._send_request(_batch_request()))
+                except Exception as e:
+                    self.log.error(f'Not possible to upload the batch of files {idx + 1} to {idx + len(batch)}.')
+                    self.log.error(f'Error: {e}')
+                for (file_name, _), status in itertools.zip_longest(batch, statuses[:len(batch)]):
+                    success = status is not None and 200 <= status < 300
+                    results.append({
+                        'file_name': file_name,
+                        'success': success
+                    })
+                    if success:
+                        event['bytes'] += sizes.get(file_name, 0)
+                    else:
+                        event['outcome'] = TransferMetrics.OUTCOME_FAILED
+        self.invalidate_folder(folder_name)
+        succeeded = sum(1 for r in results if r['success'])
+        self.log.info(f'Uploaded {succeeded} of {len(results)} files to {folder_name} in batches of {batch_size}.')
+        return results
+
+    def upload_file_in_chunks(self, file_path, folder_name, chunk_size, chunk_uploaded=None, adaptive=False, **kwargs):
         """
         Uploads a file to SharePoint in chunks to handle large files.
 
@@ -524,6 +1891,8 @@ class SharePoint:
         :param folder_name: Folder in which to upload the file.
         :param chunk_size: Size of each chunk for uploading the file.
         :param chunk_uploaded: Callback function to track progress during upload.
+        :param adaptive: If True, chunk_size is only the size of the first chunk, the next ones grow or shrink with
+            the measured throughput (see next_chunk_size) (default: False).
         :param kwargs: Additional arguments for file upload.
         :return: Response from SharePoint, or None if the upload fails.
         """
@@ -531,13 +1900,21 @@ class SharePoint:
             self.getConnection()
         target_folder_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_name}'
         try:
-            target_folder = self.ctx.web.get_folder_by_server_relative_path(target_folder_url)
-            return target_folder.files.create_upload_session(
-                source_path=file_path,
-                chunk_size=chunk_size,
-                chunk_uploaded=chunk_uploaded,
-                **kwargs
-            ).execute_query()
+            with self._measure('upload', f'{folder_name}/{os.path.basename(file_path)}') as event:
+                if adaptive:
+                    targ_file_url = f'{target_folder_url}/{os.path.basename(file_path)}'
+                    result = self._upload_in_chunks(file_path, targ_file_url, chunk_size, chunk_uploaded, adaptive=True)
+                else:
+                    target_folder = self.ctx.web.get_folder_by_server_relative_path(target_folder_url)
+                    result = self._execute(lambda: target_folder.files.create_upload_session(
+                        source_path=file_path,
+                        chunk_size=chunk_size,
+                        chunk_uploaded=chunk_uploaded,
+                        **kwargs
+                    ).execute_query())
+                event['bytes'] = os.path.getsize(file_path)
+            self.invalidate_folder(folder_name)
+            return result
         except Exception as e:
             self.log.error(f'Not possible to upload file.')
             self.log.error(f'Error: {e}')
@@ -549,7 +1926,8 @@ class SharePoint:
 
         :param url_src_path_file: Source file path in SharePoint.
         :param url_dst_path_file: Destination file path in SharePoint.
-        :param _retry: Number of retries in case of failure.
+        :param _retry: Number of retries in case of failure. The throttled requests are already retried by the
+            scheduler, so they are not retried again here.
         :return: True if the file was successfully renamed, False otherwise.
         """
         if self.ctx is None:
@@ -560,26 +1938,30 @@ class SharePoint:
             # get the file to move
             src_file = self.ctx.web.get_file_by_server_relative_url(src)
             # rename the file
-            src_file.rename(dst).execute_query()
+            self._execute(lambda: src_file.rename(dst).execute_query())
+            self.invalidate_folder(Path(url_src_path_file).parent.as_posix())
         except Exception as e:
             self.log.error(f'Not possible to move file. {src} -> {dst}.')
             self.log.error(f'Error: {e}')
+            if RequestScheduler.is_transient(e):
+                # the scheduler already retried it until it gave up
+                self.log.fatal(f'Not possible to move {url_src_path_file} to {url_dst_path_file}!!!')
+                return False
             if _retry == -1:
                 self.log.info(f'Trying again...')
-                sleep(5)
-                self.rename_file(url_src_path_file, url_dst_path_file, _retry=5)
+                self.scheduler.wait(0)
+                return self.rename_file(url_src_path_file, url_dst_path_file, _retry=5)
             elif _retry > 0:
                 self.log.info(f'And trying again...')
-                sleep(5)
-                self.rename_file(url_src_path_file, url_dst_path_file, _retry=_retry - 1)
-            else:
-                self.log.fatal(f'Not possible to move {url_src_path_file} to {url_dst_path_file}!!!')
+                self.scheduler.wait(6 - _retry)
+                return self.rename_file(url_src_path_file, url_dst_path_file, _retry=_retry - 1)
+            self.log.fatal(f'Not possible to move {url_src_path_file} to {url_dst_path_file}!!!')
             return False
         return True
 
     def get_list(self, list_name):  # this is for lists and NOT files NOR folders
         """
-        Retrieves items from a specified SharePoint list.
+        Retrieves items from a specified SharePoint list, all at once. Use iter_list_items for large lists.
 
         :param list_name: Name of the SharePoint list to retrieve items from.
         :return: List of items from the specified SharePoint list.
@@ -587,9 +1969,40 @@ class SharePoint:
         if self.ctx is None:
             self.getConnection()
         target_list = self.ctx.web.lists.get_by_title(list_name)
-        items = target_list.items.get().execute_query()
+        items = self._execute(lambda: target_list.items.get().execute_query())
         return items
 
+    def iter_list_items(self, list_name, select=None, filter=None, page_size=PAGE_SIZE):
+        """
+        Lists the items of a SharePoint list page by page, following the paging of the server, so only one page is in
+        memory at a time whatever the size of the list.
+
+        The items are read in the order of their ID, which SharePoint can page beyond the list view threshold. A filter
+        on a column that is not indexed fails on lists above the threshold.
+
+        :param list_name: Title of the SharePoint list.
+        :param select: Optional list (or comma separated string) of the fields to return, for example ['Id', 'Title'].
+        :param filter: Optional OData filter, for example "Status eq 'Done'".
+        :param page_size: Number of items requested in each page (default: PAGE_SIZE).
+        :return: Generator of the items as dictionaries with the selected fields. If a page can not be read, the error
+            is logged and raised.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        title = list_name.replace("'", "''")
+        params = {'$top': page_size}
+        if select:
+            params['$select'] = select if isinstance(select, str) else ','.join(select)
+        if filter:
+            params['$filter'] = filter
+        try:
+            yield from self._iter_json(f"{self.__sharepoint_site_}/_api/web/lists/GetByTitle('{quote(title)}')/items",
+                                       params)
+        except Exception as e:
+            self.log.error(f'Not possible to list the items of the list {list_name}.')
+            self.log.error(f'Error: {e}')
+            raise
+
     def get_file_properties_from_folder(self, folder_name):
         """
         Retrieves properties of all files in the specified folder.
@@ -606,32 +2019,49 @@ class SharePoint:
                 return []
         properties_list = []
         for file in files_list:
-            file_dict = {
-                'file_id': file.unique_id,
-                'file_name': file.name,
-                'major_version': file.major_version,
-                'minor_version': file.minor_version,
-                'file_size': file.length,
-                'time_created': file.time_created,
-                'time_last_modified': file.time_last_modified
-            }
-            properties_list.append(file_dict)
-            # file_dict = {}
+            properties_list.append(self._file_properties(file))
         return properties_list
 
     def get_file_properties(self, file_name, folder_name):
         """
         Retrieves properties of a specific file in a given folder.
 
+        Only the file is requested to SharePoint, so the cost does not depend on the number of files in the folder.
+
         :param file_name: Name of the file to retrieve properties for.
         :param folder_name: Folder containing the file.
         :return: Dictionary containing the file properties, or None if not found.
         """
-        file_properties_list = self.get_file_properties_from_folder(folder_name)
-        for file in file_properties_list:
-            if file['file_name'] == file_name:
-                return file
-        return None
+        if self.ctx is None:
+            self.getConnection()
+        file_url = Path(f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_name}/{file_name}')
+        try:
+            file = self._execute(
+                lambda: self.ctx.web.get_file_by_server_relative_path(file_url.as_posix()).get().execute_query())
+        except Exception as e:
+            self.log.error(f'Not possible to get the properties of {file_url.as_posix()}.')
+            self.log.error(f'Error: {e}')
+            return None
+        return self._file_properties(file)
+
+    @staticmethod
+    def _file_properties(file):
+        """
+        Returns the properties of a loaded SharePoint file as a dictionary.
+
+        :param file: File object with its properties loaded.
+        :return: Dictionary with file_id, file_name, major_version, minor_version, file_size, time_created and
+            time_last_modified.
+        """
+        return {
+            'file_id': file.unique_id,
+            'file_name': file.name,
+            'major_version': file.major_version,
+            'minor_version': file.minor_version,
+            'file_size': file.length,
+            'time_created': file.time_created,
+            'time_last_modified': file.time_last_modified
+        }
 
     def ensure_folder_exists(self, folder_url):
         """
@@ -644,13 +2074,108 @@ class SharePoint:
             self.getConnection()
         folder_full_url = Path(f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{folder_url}')
         try:
-            self.ctx.web.ensure_folder_path(folder_full_url.as_posix()).execute_query()
+            self._ensure_folder(folder_url)
             return True
         except Exception as e:
             self.log.error(f'Problem creating or checking {folder_full_url}.')
             self.log.error(f'Error: {e}')
             return False
 
+    def _ensure_folder(self, folder_name):
+        """
+        Ensures that a folder of the document library exists, asking SharePoint only the first time in the session.
+
+        :param folder_name: Folder inside the document library.
+        :raises Exception: The error of SharePoint if the folder can not be created.
+        """
+        key = self._folder_key(folder_name)
+        with self._known_folders_lock_:
+            if key in self.known_folders:
+                return
+        folder_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}/{key}'.rstrip('/')
+        self._execute(lambda: self.ctx.web.ensure_folder_path(folder_url).execute_query())
+        self.invalidate_folder(key, parents=True)
+        self._add_known_folder(key)
+
+    def _add_known_folder(self, folder_name):
+        """
+        Records that a folder and all its parents exist.
+        """
+        key = self._folder_key(folder_name)
+        with self._known_folders_lock_:
+            while key and key not in self.known_folders:
+                self.known_folders.add(key)
+                key = posixpath.dirname(key)
+
+    def _forget_folder(self, folder_name):
+        """
+        Removes a folder from the known folders, so it is checked again the next time it is needed.
+        """
+        with self._known_folders_lock_:
+            self.known_folders.discard(self._folder_key(folder_name))
+
+    def provision_folders(self, folders, max_workers=MAX_WORKERS):
+        """
+        Creates the folders of a whole job before any file is transferred.
+
+        The folders and all their parents are deduplicated, the ones already known in this session are left out, and
+        the rest are created level by level (the parents before their subfolders), the folders of every level at the
+        same time with one request each. The folders created are known for the rest of the session, so the uploads to
+        them do not check them again.
+
+        :param folders: Iterable of folders inside the document library.
+        :param max_workers: Maximum number of folders created at the same time (default: MAX_WORKERS).
+        :return: True if all the folders exist, False if some of them could not be created.
+        """
+        if self.ctx is None:
+            self.getConnection()
+        missing = set()
+        for folder in folders:
+            key = self._folder_key(folder)
+            while key:
+                missing.add(key)
+                key = posixpath.dirname(key)
+        with self._known_folders_lock_:
+            missing -= self.known_folders
+        if not missing:
+            return True
+        levels = {}
+        for key in missing:
+            levels.setdefault(key.count('/'), []).append(key)
+        workers = threading.local()
+        root_url = f'/sites/{self.__sharepoint_site_name_}/{self.__sharepoint_doc_}'
+
+        def _create(key):
+            if not hasattr(workers, 'sp'):
+                workers.sp = self.clone()
+            parent, name = posixpath.split(key)
+            parent_url = f'{root_url}/{parent}'.rstrip('/')
+            workers.sp._execute(lambda: workers.sp.ctx.web.get_folder_by_server_relative_url(parent_url)
+                                .folders.add(name).execute_query())
+
+        elapsed_time = ElapsedTime.ElapsedTime()
+        failed = set()
+        with self._span('provision'), ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for depth in sorted(levels):
+                # the subfolders of a folder that could not be created are not tried
+                keys = [k for k in levels[depth] if posixpath.dirname(k) not in failed]
+                failed.update(k for k in levels[depth] if posixpath.dirname(k) in failed)
+                futures = {executor.submit(_create, key): key for key in keys}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        future.result()
+                        self._add_known_folder(key)
+                    except Exception as e:
+                        self.log.error(f'Not possible to create folder {root_url}/{key}.')
+                        self.log.error(f'Error: {e}')
+                        failed.add(key)
+        for key in missing - failed:
+            self.invalidate_folder(key, parents=True)
+        self.log.info(f'{len(missing) - len(failed)} of {len(missing)} folders provisioned in {elapsed_time.elapsed()}'
+                      f', {len(failed)} failed.')
+        return not failed
+
     def set_username(self, username):
         self.__username_ = username
 
@@ -680,18 +2205,156 @@ class SharePoint:
 
     def bar_download_progress(self, offset):
         """
-        Progress bar handler for file downloads.
+        Progress bar handler for file downloads. It reports the offset to pbar, the transfer in progress, if there is
+        one.
 
-        :param offset: Current position in the upload (in bytes).
+        :param offset: Current position in the download (in bytes).
         """
-        self.pbar.update(offset - self.pbar.n)
+        if self.pbar is not None:
+            self.pbar(offset)
 
     def bar_upload_progress(self, offset):
         """
-        Progress bar handler for file uploads.
+        Progress bar handler for file uploads. It reports the offset to pbar, the transfer in progress, if there is
+        one.
 
         :param offset: Current position in the upload (in bytes).
         """
-        mb = 1024 * 1024
-        sys.stdout.write(f"\rUploaded {round(offset/mb,2)} MB of {round(self.__total_size_ / mb, 2)} MB ...[{round(offset / self.__total_size_ * 100, 2)}%]")
-        sys.stdout.flush()
+        if self.pbar is not None:
+            self.pbar(offset)
+
+
+class AsyncSharePoint:
+    """
+    Asyncio counterpart of the SharePoint class.
+
+    The operations run in a pool of threads shared by all the calls, each thread with its own clone of a SharePoint
+    object, so all of them share one authentication. At most max_concurrency operations run at the same time, the
+    rest wait in the queue of the pool without using a thread, so thousands of operations can be awaited together.
+    The object can be used from several event loops one after the other, for example with successive asyncio.run
+    calls; the pool is created again after it is closed.
+
+    Example:
+        async with AsyncSharePoint(max_concurrency=8) as asp:
+            await asyncio.gather(*(asp.upload_large_file(f, f'Bahada/{f.name}') for f in files))
+
+    Attributes:
+        sp: SharePoint object cloned by the threads.
+        max_concurrency: Maximum number of operations running at the same time.
+    """
+
+    def __init__(self, sharepoint=None, max_concurrency=ASYNC_CONCURRENCY, **kwargs):
+        """
+        Initializes the AsyncSharePoint class.
+
+        :param sharepoint: SharePoint object to use. If None, one is created with kwargs.
+        :param max_concurrency: Maximum number of operations running at the same time (default: ASYNC_CONCURRENCY).
+        :param kwargs: Parameters of the SharePoint constructor, when sharepoint is None.
+        """
+        self.sp = sharepoint if sharepoint is not None else SharePoint(**kwargs)
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor_ = None
+        self._executor_lock_ = threading.Lock()
+        self._workers_ = threading.local()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        # waiting for the threads blocks, so it is done out of the event loop
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self):
+        """
+        Stops the threads once the operations in progress finish. A later operation starts a new pool.
+        """
+        with self._executor_lock_:
+            executor, self._executor_ = self._executor_, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _executor(self):
+        """
+        Returns the pool of threads, creating it if it was not created yet or was closed.
+        """
+        with self._executor_lock_:
+            if self._executor_ is None:
+                self._executor_ = ThreadPoolExecutor(max_workers=self.max_concurrency)
+            return self._executor_
+
+    def _call_(self, name, args, kwargs):
+        """
+        Runs a method of SharePoint in the current thread, with the clone of the thread.
+        """
+        if not hasattr(self._workers_, 'sp'):
+            self._workers_.sp = self.sp.clone()
+        return getattr(self._workers_.sp, name)(*args, **kwargs)
+
+    async def _run(self, name, *args, **kwargs):
+        """
+        Runs a method of SharePoint in the pool of threads, which runs at most max_concurrency of them at a time.
+
+        :param name: Name of the SharePoint method.
+        :return: The value returned by the method.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), functools.partial(self._call_, name, args, kwargs))
+
+    async def get_files_list(self, folder_name=None):
+        """
+        Async version of SharePoint.get_files_list.
+        """
+        return await self._run('get_files_list', folder_name)
+
+    async def get_folder_list(self, folder_name=None):
+        """
+        Async version of SharePoint.get_folder_list.
+        """
+        return await self._run('get_folder_list', folder_name)
+
+    async def get_file_properties(self, file_name, folder_name):
+        """
+        Async version of SharePoint.get_file_properties.
+        """
+        return await self._run('get_file_properties', file_name, folder_name)
+
+    async def get_file_properties_from_folder(self, folder_name):
+        """
+        Async version of SharePoint.get_file_properties_from_folder.
+        """
+        return await self._run('get_file_properties_from_folder', folder_name)
+
+    async def upload_large_file(self, local_file_path, target_file_url, chunk_size=CHUNK_SIZE, show_progress=True,
+                                adaptive=False, skip_unchanged=False):
+        """
+        Async version of SharePoint.upload_large_file. The uploads running at the same time share one progress bar.
+        """
+        return await self._run('upload_large_file', local_file_path, target_file_url, chunk_size=chunk_size,
+                               show_progress=show_progress, adaptive=adaptive, skip_unchanged=skip_unchanged)
+
+    async def download_large_file(self, file_name, folder_name, local_path_name, max_workers=1,
+                                  range_size=CHUNK_SIZE, show_progress=True):
+        """
+        Async version of SharePoint.download_large_file.
+        """
+        return await self._run('download_large_file', file_name, folder_name, local_path_name,
+                               max_workers=max_workers, range_size=range_size, show_progress=show_progress)
+
+    async def download_file_to(self, file_name, folder_name, destination, block_size=BLOCK_SIZE, transfer=None):
+        """
+        Async version of SharePoint.download_file_to.
+        """
+        return await self._run('download_file_to', file_name, folder_name, destination, block_size=block_size,
+                               transfer=transfer)
+
+    async def ensure_folder_exists(self, folder_url):
+        """
+        Async version of SharePoint.ensure_folder_exists.
+        """
+        return await self._run('ensure_folder_exists', folder_url)
+
+    async def rename_file(self, url_src_path_file, url_dst_path_file):
+        """
+        Async version of SharePoint.rename_file.
+        """
+        return await self._run('rename_file', url_src_path_file, url_dst_path_file)
@@ -1,7 +1,7 @@
 from office365_api import SharePoint
 import re
 import sys, os
-from pathlib import PurePath
+from pathlib import PurePath, Path
 
 
 # 1 args = Root Directory Path of files to upload
@@ -14,14 +14,17 @@ FILE_NAME_PATTERN = sys.argv[3]
 
 def upload_files(folder, keyword=None):
     file_list = get_list_of_files(folder)
-    for file in file_list:
-        if keyword is None or keyword == 'None' or re.search(keyword, file[0]):
-            file_content = get_file_content(file[1])
-            SharePoint().upload_file(file[0], SHAREPOINT_FOLDER_NAME, file_content)
+    files = [(file[0], Path(file[1])) for file in file_list
+             if keyword is None or keyword == 'None' or re.search(keyword, file[0])]
+    # the files are sent in $batch requests, each one with many files
+    results = SharePoint.shared().upload_files_batch(files, SHAREPOINT_FOLDER_NAME)
+    for result in results:
+        if not result['success']:
+            print(f'File not uploaded: {result["file_name"]}')
 
 
 def upload_file(file_n, folder, content):
-    SharePoint().upload_file(file_n, folder, content)
+    SharePoint.shared().upload_file(file_n, folder, content)
 
 
 def get_list_of_files(folder):
@@ -34,11 +37,5 @@ def get_list_of_files(folder):
     return file_list
 
 
-# read files and return the content of file
-def get_file_content(file_path):
-    with open(file_path, 'rb') as f:
-        return f.read()
-
-
 if __name__ == '__main__':
     upload_files(ROOT_DIR, FILE_NAME_PATTERN)
\ No newline at end of file
@@ -2,39 +2,48 @@
 # Since the local folder has almost the same structure that the folder in the SharePoint, the script
 # will remove the first part of the local folder path and use the rest of the path to create the folder structure.
 # In this case will remove the 'E:/Data/' and use the rest of the path to create the folder structure.
+# Only the files that are new or changed since their last successful upload are uploaded. This is tracked in a local
+# manifest (SQLite file) with the size and modification time of each uploaded file. The files with a new modification
+# time are hashed, and the ones with the same content that was uploaded are skipped instead of uploaded again.
 
 from pathlib import Path
-from datetime import datetime, timedelta
 
 import office365_api
 import Log
 import ElapsedTime
+import SyncManifest
 
 folder_path = Path(r'C:/temp/data2/Bahada/CR3000/L0/Flux/')
 root_folder = r'C:/temp/data2/'  # r'E:/Data/'
+max_workers = 4  # number of files uploaded at the same time, use 1 to upload one file at a time
+manifest_path = Path(root_folder, SyncManifest.MANIFEST_NAME)  # local record of the files already uploaded
 
 if __name__ == '__main__':
     # Create the log file
-    log = Log.Log('upload_folder_script.txt')
+    # buffered, so the log of every file does not open and close the file during the upload
+    log = Log.Log('upload_folder_script.txt', buffered=True)
     # Create the elapsed time object
     et = ElapsedTime.ElapsedTime()
-    # set connection to SharePoint
-    sp = office365_api.SharePoint(log=log)
-    # Get the current time and the time from two days ago
-    specific_time = datetime.now() - timedelta(days=2)
-    # Specific time, if needed (uncomment and set if you want a specific cutoff time)
-    # specific_time = datetime(2024, 9, 5, 10, 30)  # Replace with your specific date and time
-    # Get the list of files in the local folder
-    files = [f for f in folder_path.rglob('*') if
-             f.is_file() and datetime.fromtimestamp(f.stat().st_mtime) >= specific_time]
-    idx = 1
-    for item in files:
-        log.info(f'File: {item.name}, ({idx}/{len(files)})')
-        # print(item)
-        upload_file = item.relative_to(root_folder)
-        # print(upload_file)
-        # Upload the files to the SharePoint folder
-        sp.upload_large_file(local_file_path=item, target_file_url=upload_file)
-        idx += 1
+    # Open the manifest of the files already uploaded
+    manifest = SyncManifest.SyncManifest(manifest_path)
+    # set connection to SharePoint, the content hash of the uploaded files is recorded in the manifest
+    sp = office365_api.SharePoint(log=log, manifest=manifest)
+    # Get the list of files in the local folder that are new or changed since their last upload
+    files = manifest.changed(f for f in folder_path.rglob('*') if f.is_file() and f != manifest.path)
+    log.info(f'{len(files)} files to upload with {max_workers} workers')
+    # Upload the files to the SharePoint folder, the target is the path relative to the root folder
+    # Every result is recorded in the manifest as soon as the file finishes
+    def record(result):
+        if result['success']:
+            manifest.mark_uploaded(result['local_file_path'], result['target_file_url'])
+        else:
+            manifest.mark_failed(result['local_file_path'], result['target_file_url'])
+
+    results, summary = sp.upload_large_files([(item, item.relative_to(root_folder)) for item in files],
+                                             max_workers=max_workers, file_uploaded=record, skip_unchanged=True)
+    manifest.close()
+    for result in results:
+        if not result['success']:
+            log.error(f'File not uploaded: {result["local_file_path"]}')
     # Log the elapsed time
     log.info(f'Elapsed time: {et.elapsed()}')